@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import asyncio
+from functools import lru_cache
 from typing import Any, Optional
 
 from mcp.server.fastmcp import Context, FastMCP
@@ -8,7 +8,24 @@ from thordata import Engine, SerpRequest
 from thordata.enums import OutputFormat
 
 from ...context import ServerContext
-from ...utils import handle_mcp_errors, ok_response, safe_ctx_info
+from ...utils import handle_mcp_errors, map_bounded, ok_response, safe_ctx_info
+
+
+@lru_cache(maxsize=32)
+def _engine_enum(engine: str) -> Engine:
+    """Map an engine name to the SDK enum, defaulting to Google when unknown."""
+    engine = engine.lower()
+    if engine == "bing":
+        return Engine.BING
+    if engine == "yandex":
+        return Engine.YANDEX
+    if engine != "google":
+        # Try to match by name (case-insensitive)
+        try:
+            return Engine[engine.upper()]
+        except (KeyError, AttributeError):
+            pass
+    return Engine.GOOGLE
 
 
 def register(mcp: FastMCP) -> None:
@@ -58,17 +75,7 @@ def register(mcp: FastMCP) -> None:
         client = await ServerContext.get_client()
         
         # Normalize engine enum
-        engine_enum = Engine.GOOGLE
-        if engine.lower() == "bing":
-            engine_enum = Engine.BING
-        elif engine.lower() == "yandex":
-            engine_enum = Engine.YANDEX
-        elif engine.lower() != "google":
-            # Try to match by name (case-insensitive)
-            try:
-                engine_enum = Engine[engine.upper()]
-            except (KeyError, AttributeError):
-                engine_enum = Engine.GOOGLE
+        engine_enum = _engine_enum(engine)
         
         # Validate ai_overview (only for Google)
         if ai_overview and engine_enum != Engine.GOOGLE:
@@ -135,7 +142,6 @@ def register(mcp: FastMCP) -> None:
         if concurrency > 20:
             concurrency = 20
 
-        sem = asyncio.Semaphore(concurrency)
         client = await ServerContext.get_client()
 
         async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
@@ -150,19 +156,8 @@ def register(mcp: FastMCP) -> None:
                     },
                 }
             num = int(r.get("num", 10))
-            engine_str = str(r.get("engine", "google")).lower()
             ai_overview = bool(r.get("ai_overview", False))
-
-            engine_enum = Engine.GOOGLE
-            if engine_str == "bing":
-                engine_enum = Engine.BING
-            elif engine_str == "yandex":
-                engine_enum = Engine.YANDEX
-            elif engine_str != "google":
-                try:
-                    engine_enum = Engine[engine_str.upper()]
-                except (KeyError, AttributeError):
-                    engine_enum = Engine.GOOGLE
+            engine_enum = _engine_enum(str(r.get("engine", "google")))
 
             if ai_overview and engine_enum != Engine.GOOGLE:
                 return {
@@ -174,20 +169,20 @@ def register(mcp: FastMCP) -> None:
                     },
                 }
 
-            async with sem:
-                req = SerpRequest(
-                    query=query,
-                    engine=engine_enum,
-                    num=num,
-                    output_format=output_format,
-                    ai_overview=ai_overview if engine_enum == Engine.GOOGLE else False,
-                )
-                data = await client.serp_search_advanced(req)
-                return {"index": i, "ok": True, "query": query, "output": data}
+            req = SerpRequest(
+                query=query,
+                engine=engine_enum,
+                num=num,
+                output_format=output_format,
+                ai_overview=ai_overview if engine_enum == Engine.GOOGLE else False,
+            )
+
+            data = await client.serp_search_advanced(req)
+            return {"index": i, "ok": True, "query": query, "output": data}
 
-        await safe_ctx_info(ctx, f"SERP batch_search count={len(requests)} concurrency={concurrency}")
+        await safe_ctx_info(ctx, "SERP batch_search count=%s concurrency=%s", len(requests), concurrency)
 
-        results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+        results = await map_bounded(_one, requests, concurrency=concurrency)
         return ok_response(
             tool="serp.batch_search",
             input={
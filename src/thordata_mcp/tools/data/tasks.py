@@ -10,19 +10,26 @@ from __future__ import annotations
 
 import dataclasses
 import inspect
-import json
 import sys
 import importlib
 import pkgutil
 from typing import Any, Optional
 
 from mcp.server.fastmcp import Context, FastMCP
-from thordata import AsyncThordataClient
 from thordata.tools import ToolRequest
 
 from ...config import settings
+from ...context import ServerContext
 from ...utils import handle_mcp_errors, ok_response, safe_ctx_info, enrich_download_url
-from ..utils import iter_tool_request_types, tool_key, tool_schema, tool_group_from_key, matches_any_prefix_or_exact
+from ..params_utils import loads_json
+from ..utils import (
+    TASK_SUCCESS_STATUSES,
+    iter_tool_request_types,
+    matches_any_prefix_or_exact,
+    tool_group_from_key,
+    tool_key,
+    tool_schema,
+)
 
 # Increase recursion limit to avoid "maximum recursion depth" on Windows
 sys.setrecursionlimit(max(sys.getrecursionlimit(), 5000))
@@ -60,16 +67,17 @@ def register_list_only(mcp: FastMCP) -> None:
         resolved_offset = max(0, int(offset))
 
         groups_allow = [g.strip().lower() for g in (settings.THORDATA_TASKS_GROUPS or "").split(",") if g.strip()]
+        group_lc = group.strip().lower() if group else ""
+        kw = keyword.strip().lower() if keyword else ""
 
         def _matches(t: type[ToolRequest]) -> bool:
             k = tool_key(t)
             g = tool_group_from_key(k).lower()
             if resolved_mode != "all" and groups_allow and g not in groups_allow:
                 return False
-            if group and g != group.strip().lower():
+            if group and g != group_lc:
                 return False
             if keyword:
-                kw = keyword.strip().lower()
                 if kw and (kw not in k.lower()) and (kw not in (getattr(t, "SPIDER_ID", "") or "").lower()) and (kw not in (getattr(t, "SPIDER_NAME", "") or "").lower()):
                     return False
             return True
@@ -141,16 +149,17 @@ def register(mcp: FastMCP) -> None:
         resolved_offset = max(0, int(offset))
 
         groups_allow = [g.strip().lower() for g in (settings.THORDATA_TASKS_GROUPS or "").split(",") if g.strip()]
+        group_lc = group.strip().lower() if group else ""
+        kw = keyword.strip().lower() if keyword else ""
 
         def _matches(t: type[ToolRequest]) -> bool:
             k = tool_key(t)
             g = tool_group_from_key(k).lower()
             if resolved_mode != "all" and groups_allow and g not in groups_allow:
                 return False
-            if group and g != group.strip().lower():
+            if group and g != group_lc:
                 return False
             if keyword:
-                kw = keyword.strip().lower()
                 if kw and (kw not in k.lower()) and (kw not in (getattr(t, "SPIDER_ID", "") or "").lower()) and (kw not in (getattr(t, "SPIDER_NAME", "") or "").lower()):
                     return False
             return True
@@ -231,24 +240,20 @@ def register(mcp: FastMCP) -> None:
             }
         tool_request = t(**params)  # type: ignore[misc]
         await safe_ctx_info(ctx, f"Running SDK tool: {tool_key}")
-        async with AsyncThordataClient(
-            scraper_token=settings.THORDATA_SCRAPER_TOKEN,
-            public_token=settings.THORDATA_PUBLIC_TOKEN,
-            public_key=settings.THORDATA_PUBLIC_KEY,
-        ) as client:
-            task_id = await client.run_tool(tool_request)
-            result: dict[str, Any] = {
-                "task_id": task_id,
-                "spider_id": tool_request.get_spider_id(),
-                "spider_name": tool_request.get_spider_name(),
-            }
-            if wait:
-                status = await client.wait_for_task(task_id, max_wait=max_wait_seconds)
-                result["status"] = status
-                if str(status).lower() in {"ready", "success", "finished"}:
-                    download_url = await client.get_task_result(task_id, file_type=file_type)
-                    result["download_url"] = enrich_download_url(download_url, task_id=task_id, file_type=file_type)
-            return result
+        client = await ServerContext.get_client()
+        task_id = await client.run_tool(tool_request)
+        result: dict[str, Any] = {
+            "task_id": task_id,
+            "spider_id": tool_request.get_spider_id(),
+            "spider_name": tool_request.get_spider_name(),
+        }
+        if wait:
+            status = await client.wait_for_task(task_id, max_wait=max_wait_seconds)
+            result["status"] = status
+            if str(status).strip().lower() in TASK_SUCCESS_STATUSES:
+                download_url = await client.get_task_result(task_id, file_type=file_type)
+                result["download_url"] = enrich_download_url(download_url, task_id=task_id, file_type=file_type)
+        return result
 
     @mcp.tool(name="tasks.run")
     @handle_mcp_errors
@@ -290,8 +295,8 @@ def register(mcp: FastMCP) -> None:
         ctx: Optional[Context] = None,
     ) -> dict[str, Any]:
         try:
-            params_dict = json.loads(param_json) if param_json else {}
-        except json.JSONDecodeError as e:
+            params_dict = loads_json(param_json) if param_json else {}
+        except ValueError as e:
             return {
                 "ok": False,
                 "tool": "tasks.run_simple",
@@ -319,13 +324,9 @@ def register(mcp: FastMCP) -> None:
     @handle_mcp_errors
     async def tasks_status(task_id: str, *, ctx: Optional[Context] = None) -> dict[str, Any]:
         await safe_ctx_info(ctx, f"Getting task status: {task_id}")
-        async with AsyncThordataClient(
-            scraper_token=settings.THORDATA_SCRAPER_TOKEN,
-            public_token=settings.THORDATA_PUBLIC_TOKEN,
-            public_key=settings.THORDATA_PUBLIC_KEY,
-        ) as client:
-            status = await client.get_task_status(task_id)
-            return ok_response(tool="tasks.status", input={"task_id": task_id}, output={"task_id": task_id, "status": status})
+        client = await ServerContext.get_client()
+        status = await client.get_task_status(task_id)
+        return ok_response(tool="tasks.status", input={"task_id": task_id}, output={"task_id": task_id, "status": status})
 
     @mcp.tool(name="tasks.wait")
     @handle_mcp_errors
@@ -337,17 +338,13 @@ def register(mcp: FastMCP) -> None:
         ctx: Optional[Context] = None,
     ) -> dict[str, Any]:
         await safe_ctx_info(ctx, f"Waiting for task {task_id}")
-        async with AsyncThordataClient(
-            scraper_token=settings.THORDATA_SCRAPER_TOKEN,
-            public_token=settings.THORDATA_PUBLIC_TOKEN,
-            public_key=settings.THORDATA_PUBLIC_KEY,
-        ) as client:
-            status = await client.wait_for_task(task_id, poll_interval=poll_interval_seconds, max_wait=max_wait_seconds)
-            return ok_response(
-                tool="tasks.wait",
-                input={"task_id": task_id},
-                output={"task_id": task_id, "status": status},
-            )
+        client = await ServerContext.get_client()
+        status = await client.wait_for_task(task_id, poll_interval=poll_interval_seconds, max_wait=max_wait_seconds)
+        return ok_response(
+            tool="tasks.wait",
+            input={"task_id": task_id},
+            output={"task_id": task_id, "status": status},
+        )
 
     @mcp.tool(name="tasks.result")
     @handle_mcp_errors
@@ -358,14 +355,10 @@ def register(mcp: FastMCP) -> None:
         ctx: Optional[Context] = None,
     ) -> dict[str, Any]:
         await safe_ctx_info(ctx, f"Getting result for {task_id}")
-        async with AsyncThordataClient(
-            scraper_token=settings.THORDATA_SCRAPER_TOKEN,
-            public_token=settings.THORDATA_PUBLIC_TOKEN,
-            public_key=settings.THORDATA_PUBLIC_KEY,
-        ) as client:
-            download_url = await client.get_task_result(task_id, file_type=file_type)
-            return ok_response(
-                tool="tasks.result",
-                input={"task_id": task_id},
-                output={"task_id": task_id, "download_url": enrich_download_url(download_url, task_id=task_id, file_type=file_type)},
-            )
+        client = await ServerContext.get_client()
+        download_url = await client.get_task_result(task_id, file_type=file_type)
+        return ok_response(
+            tool="tasks.result",
+            input={"task_id": task_id},
+            output={"task_id": task_id, "download_url": enrich_download_url(download_url, task_id=task_id, file_type=file_type)},
+        )
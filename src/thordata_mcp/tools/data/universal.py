@@ -1,14 +1,26 @@
 from __future__ import annotations
 
-import asyncio
-import base64
 from typing import Any, Optional
 
 from mcp.server.fastmcp import Context, FastMCP
 
 from ...context import ServerContext
 from ...monitoring import PerformanceTimer
-from ...utils import handle_mcp_errors, html_to_markdown_clean, ok_response, safe_ctx_info, truncate_content
+from ...utils import encode_png_base64, handle_mcp_errors, html_to_markdown_clean, map_bounded, ok_response, safe_ctx_info
+
+
+def _png_payload(data: bytes | bytearray) -> dict[str, Any]:
+    """Encode a PNG screenshot for a JSON response."""
+    return {"png_base64": encode_png_base64(data), "size": len(data), "format": "png"}
+
+
+def _as_html(data: Any) -> str:
+    """Coerce a scrape response to text, decoding raw bytes instead of repr-ing them."""
+    if type(data) is str:
+        return data
+    if isinstance(data, (bytes, bytearray)):
+        return data.decode("utf-8", "replace")
+    return str(data)
 
 
 def register(mcp: FastMCP) -> None:
@@ -55,7 +67,8 @@ def register(mcp: FastMCP) -> None:
 
         kwargs = extra_params or {}
         wait = int(wait_ms) if wait_ms is not None else None
-        
+        output_format_lc = output_format.lower()
+
         # Add new parameters if provided
         if follow_redirect is not None:
             kwargs["follow_redirect"] = follow_redirect
@@ -89,10 +102,10 @@ def register(mcp: FastMCP) -> None:
             result_output: dict[str, Any] = {}
             for fmt, content in data.items():
                 if fmt == "png" and isinstance(content, (bytes, bytearray)):
-                    result_output["png_base64"] = base64.b64encode(content).decode("utf-8")
+                    result_output["png_base64"] = encode_png_base64(content)
                     result_output["png_size"] = len(content)
                 elif fmt == "html":
-                    result_output["html"] = str(content) if not isinstance(content, str) else content
+                    result_output["html"] = _as_html(content)
                 else:
                     result_output[fmt] = str(content) if not isinstance(content, (str, bytes)) else content
             
@@ -117,13 +130,11 @@ def register(mcp: FastMCP) -> None:
             )
 
         # Single format output
-        if output_format.lower() == "png" or (isinstance(data, (bytes, bytearray))):
+        if output_format_lc == "png" or (isinstance(data, (bytes, bytearray))):
             if isinstance(data, (bytes, bytearray)):
-                png_base64 = base64.b64encode(data).decode("utf-8")
-                size = len(data)
+                png_output = _png_payload(data)
             else:
-                png_base64 = str(data)
-                size = None
+                png_output = {"png_base64": str(data), "size": None, "format": "png"}
             return ok_response(
                 tool="universal.fetch",
                 input={
@@ -141,10 +152,10 @@ def register(mcp: FastMCP) -> None:
                     "header": header,
                     "extra_params": extra_params,
                 },
-                output={"png_base64": png_base64, "size": size, "format": "png"},
+                output=png_output,
             )
 
-        html = str(data) if not isinstance(data, str) else data
+        html = _as_html(data)
         return ok_response(
             tool="universal.fetch",
             input={
@@ -201,9 +212,8 @@ def register(mcp: FastMCP) -> None:
                 block_resources=block_resources,
                 **kwargs,
             )
-            html_str = str(html) if not isinstance(html, str) else html
-            markdown = html_to_markdown_clean(html_str)
-            markdown = truncate_content(markdown, max_length=max_chars)
+            html_str = _as_html(html)
+            markdown = html_to_markdown_clean(html_str, max_chars=max_chars)
             return ok_response(
                 tool="universal.fetch_markdown",
                 input={
@@ -236,7 +246,6 @@ def register(mcp: FastMCP) -> None:
         if concurrency > 20:
             concurrency = 20
 
-        sem = asyncio.Semaphore(concurrency)
         client = await ServerContext.get_client()
 
         async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
@@ -245,6 +254,7 @@ def register(mcp: FastMCP) -> None:
                 return {"index": i, "ok": False, "error": {"type": "validation_error", "message": "Missing url"}}
 
             output_format = str(r.get("output_format", "html"))
+            output_format_lc = output_format.lower()
             js_render = bool(r.get("js_render", False))
             country = r.get("country")
             block_resources = r.get("block_resources")
@@ -254,9 +264,9 @@ def register(mcp: FastMCP) -> None:
             clean_content = r.get("clean_content")
             headers = r.get("headers")
             cookies = r.get("cookies")
-            extra_params = r.get("extra_params") or {}
-            if not isinstance(extra_params, dict):
-                extra_params = {}
+            # Copy so the caller's request dict is not mutated below.
+            extra_params = r.get("extra_params")
+            extra_params = dict(extra_params) if isinstance(extra_params, dict) else {}
 
             # Add new parameters if provided
             if follow_redirect is not None:
@@ -270,48 +280,45 @@ def register(mcp: FastMCP) -> None:
 
             wait = int(wait_ms) if isinstance(wait_ms, (int, float)) else None
 
-            async with sem:
-                with PerformanceTimer(tool="universal.batch_fetch", url=url):
-                    # Use new namespace API
-                    data = await client.universal.scrape_async(
-                        url=url,
-                        js_render=js_render,
-                        country=country,
-                        wait_for=wait_for,
-                        wait_time=wait,
-                        output_format=output_format,
-                        block_resources=block_resources,
-                        **extra_params,
-                    )
+            with PerformanceTimer(tool="universal.batch_fetch", url=url):
+                # Use new namespace API
+                data = await client.universal.scrape_async(
+                    url=url,
+                    js_render=js_render,
+                    country=country,
+                    wait_for=wait_for,
+                    wait_time=wait,
+                    output_format=output_format,
+                    block_resources=block_resources,
+                    **extra_params,
+                )
 
             # Handle multiple output formats
             if isinstance(data, dict) and len(data) > 1:
                 result_output: dict[str, Any] = {}
                 for fmt, content in data.items():
                     if fmt == "png" and isinstance(content, (bytes, bytearray)):
-                        result_output["png_base64"] = base64.b64encode(content).decode("utf-8")
+                        result_output["png_base64"] = encode_png_base64(content)
                         result_output["png_size"] = len(content)
                     elif fmt == "html":
-                        result_output["html"] = str(content) if not isinstance(content, str) else content
+                        result_output["html"] = _as_html(content)
                     else:
                         result_output[fmt] = str(content) if not isinstance(content, (str, bytes)) else content
                 return {"index": i, "ok": True, "url": url, "output": result_output}
 
-            if output_format.lower() == "png" or isinstance(data, (bytes, bytearray)):
+            if output_format_lc == "png" or isinstance(data, (bytes, bytearray)):
                 if isinstance(data, (bytes, bytearray)):
-                    png_base64 = base64.b64encode(data).decode("utf-8")
-                    size = len(data)
+                    png_output = _png_payload(data)
                 else:
-                    png_base64 = str(data)
-                    size = None
-                return {"index": i, "ok": True, "url": url, "output": {"png_base64": png_base64, "size": size, "format": "png"}}
+                    png_output = {"png_base64": str(data), "size": None, "format": "png"}
+                return {"index": i, "ok": True, "url": url, "output": png_output}
 
-            html = str(data) if not isinstance(data, str) else data
+            html = _as_html(data)
             return {"index": i, "ok": True, "url": url, "output": {"html": html}}
 
-        await safe_ctx_info(ctx, f"Universal batch_fetch count={len(requests)} concurrency={concurrency}")
+        await safe_ctx_info(ctx, "Universal batch_fetch count=%s concurrency=%s", len(requests), concurrency)
 
-        results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+        results = await map_bounded(_one, requests, concurrency=concurrency)
         return ok_response(
             tool="universal.batch_fetch",
             input={"count": len(requests), "concurrency": concurrency},
@@ -7,7 +7,7 @@ from mcp.server.fastmcp import FastMCP
 
 from thordata_mcp.config import settings
 from thordata_mcp.context import ServerContext
-from thordata_mcp.utils import ok_response
+from thordata_mcp.utils import gather_ordered, ok_response
 from thordata_mcp.tools.params_utils import normalize_params
 
 
@@ -105,10 +105,12 @@ def register(mcp: FastMCP) -> None:
             aria = snap.get("aria_snapshot") if isinstance(snap, dict) else None
             return {"aria_non_empty": bool(aria), "aria_len": len(aria) if isinstance(aria, str) else None, "url": snap.get("url") if isinstance(snap, dict) else None}
 
-        results = await asyncio.gather(
-            _run("serp.search", _check_serp),
-            _run("unlocker.fetch(html,js_render=true)", _check_unlocker),
-            _run("browser.snapshot(filtered,max_items=20)", _check_browser_snapshot),
+        results = await gather_ordered(
+            (
+                _run("serp.search", _check_serp),
+                _run("unlocker.fetch(html,js_render=true)", _check_unlocker),
+                _run("browser.snapshot(filtered,max_items=20)", _check_browser_snapshot),
+            )
         )
 
         summary = []
@@ -2,11 +2,47 @@
 
 from __future__ import annotations
 
-import json
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
+from pydantic_core import from_json
+
 from thordata_mcp.utils import error_response
 
+# Only short JSON strings are memoized; long payloads are rarely repeated verbatim.
+_PARAMS_CACHE_MAX_LEN = 4096
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+# Constant parts of the create_json_error message; only the detail and received snippet vary.
+_JSON_ERR_PREFIX = "Invalid JSON in params: "
+_JSON_ERR_SUFFIX = (
+    ". Use dictionary format: params={'url': 'https://example.com'} "
+    "or valid JSON string: params='{\"url\":\"https://example.com\"}'. "
+    "Received: "
+)
+
+
+def loads_json(data: str | bytes) -> Any:
+    """Parse a user-supplied JSON blob (spider_parameters, param_json, ...).
+
+    Uses pydantic-core's Rust parser, which ships with pydantic and is several
+    times faster than json.loads. Invalid input raises ValueError.
+    """
+    return from_json(data)
+
+
+@lru_cache(maxsize=512)
+def _parse_flat_params(params: str) -> tuple[tuple[str, Any], ...] | None:
+    """Parse a JSON params string, memoizing flat objects as immutable item tuples.
+
+    Returns None when the JSON is not a dict of scalars; such values could be
+    mutated by callers and must be re-parsed instead of shared.
+    """
+    parsed = loads_json(params)
+    if isinstance(parsed, dict) and all(isinstance(v, _SCALAR_TYPES) for v in parsed.values()):
+        return tuple(parsed.items())
+    return None
+
 
 def normalize_params(params: Any, tool_name: str, action: Optional[str] = None) -> Dict[str, Any]:
     """
@@ -34,11 +70,12 @@ def normalize_params(params: Any, tool_name: str, action: Optional[str] = None)
     
     if isinstance(params, str):
         try:
-            parsed = json.loads(params)
-            if not isinstance(parsed, dict):
-                raise ValueError("Parsed JSON is not a dictionary")
-            return parsed
-        except json.JSONDecodeError as e:
+            if len(params) <= _PARAMS_CACHE_MAX_LEN:
+                items = _parse_flat_params(params)
+                if items is not None:
+                    return dict(items)
+            parsed = loads_json(params)
+        except ValueError as e:
             error_msg = (
                 f"Invalid JSON in params: {e}. "
                 f"Params should be a dictionary object, not a string. "
@@ -46,6 +83,9 @@ def normalize_params(params: Any, tool_name: str, action: Optional[str] = None)
                 f"Received: {params[:100]}{'...' if len(params) > 100 else ''}"
             )
             raise ValueError(error_msg)
+        if not isinstance(parsed, dict):
+            raise ValueError("Parsed JSON is not a dictionary")
+        return parsed
     
     # Handle other types (list, number, etc.)
     error_msg = (
@@ -91,13 +131,10 @@ def create_json_error(tool_name: str, action: str, params: str, error_detail: st
     Returns:
         Error response dictionary
     """
-    error_message = (
-        f"Invalid JSON in params: {error_detail}. "
-        f"Use dictionary format: params={{'url': 'https://example.com'}} "
-        f"or valid JSON string: params='{{\"url\":\"https://example.com\"}}'. "
-        f"Received: {params[:100]}{'...' if len(params) > 100 else ''}"
+    error_message = "".join(
+        (_JSON_ERR_PREFIX, str(error_detail), _JSON_ERR_SUFFIX, params[:100], "..." if len(params) > 100 else "")
     )
-    
+
     return error_response(
         tool=tool_name,
         input={"action": action, "params": params},
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import json
 import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from urllib.parse import parse_qs, urlparse
 from typing import Any, Optional
 
@@ -10,19 +14,29 @@ import aiohttp
 from mcp.server.fastmcp import Context, FastMCP
 from thordata import ThordataAPIError, ThordataNetworkError
 from thordata.types import Engine, SerpRequest
+from thordata.types.common import CommonSettings
 from thordata.tools import ToolRequest
+from thordata.tools.base import VideoToolRequest
 
 from thordata_mcp.context import ServerContext
 from thordata_mcp.utils import (
     handle_mcp_errors,
     ok_response,
     error_response,
+    encode_png_base64,
     safe_ctx_info,
     enrich_download_url,
     html_to_markdown_clean,
-    truncate_content,
+    map_bounded,
+)
+from thordata_mcp.tools.params_utils import loads_json
+from thordata_mcp.tools.utils import (
+    TASK_SUCCESS_STATUSES,
+    iter_tool_request_types,
+    tool_group_from_key,
+    tool_key,
+    tool_schema,
 )
-from thordata_mcp.tools.utils import iter_tool_request_types, tool_key, tool_schema, tool_group_from_key
 
 
 # ---------------------------------------------------------------------------
@@ -31,13 +45,33 @@ from thordata_mcp.tools.utils import iter_tool_request_types, tool_key, tool_sch
 
 _TOOLS_CACHE: list[type[ToolRequest]] | None = None
 _TOOLS_MAP: dict[str, type[ToolRequest]] | None = None
+_VIDEO_TOOL_KEYS: frozenset[str] = frozenset()
+
+# Presentation-only output formats: fetched as HTML and converted locally.
+_MARKDOWN_FMTS: frozenset[str] = frozenset({"markdown", "md"})
+
+# Placeholder/test hosts (plus *.example.com) that never get routed to Web Scraper tools.
+_GENERIC_DOMAINS: frozenset[str] = frozenset({"example.com", "example.org", "example.net", "test.com", "localhost"})
+
+# Parallel status/result lookups in the *_batch task helpers.
+_TASK_LOOKUP_CONCURRENCY = 10
+
+# Successful JSON previews keyed by (download_url, max_chars), mapped to (monotonic
+# expiry, preview). Result files of a finished task do not change, so repeat
+# result/result_batch calls within the TTL skip the download. Callers get deep copies.
+_PREVIEW_CACHE: OrderedDict[tuple[str, int], tuple[float, dict[str, Any]]] = OrderedDict()
+_PREVIEW_CACHE_SIZE = 32
+_PREVIEW_CACHE_TTL = 300.0
+# Largest single read when streaming a result file for a preview.
+_PREVIEW_CHUNK_BYTES = 65_536
 
 
 def _ensure_tools() -> tuple[list[type[ToolRequest]], dict[str, type[ToolRequest]]]:
-    global _TOOLS_CACHE, _TOOLS_MAP
+    global _TOOLS_CACHE, _TOOLS_MAP, _VIDEO_TOOL_KEYS
     if _TOOLS_CACHE is None or _TOOLS_MAP is None:
         _TOOLS_CACHE = iter_tool_request_types()
         _TOOLS_MAP = {tool_key(t): t for t in _TOOLS_CACHE}
+        _VIDEO_TOOL_KEYS = frozenset(k for k, t in _TOOLS_MAP.items() if issubclass(t, VideoToolRequest))
     return _TOOLS_CACHE, _TOOLS_MAP
 
 
@@ -87,7 +121,12 @@ def _extract_amazon_asin(url: str) -> str | None:
     return m.group(1) if m else None
 
 
+@lru_cache(maxsize=1024)
 def _hostname(url: str) -> str:
+    """Lower-cased host with a leading www./m. removed; "" if the URL does not parse.
+
+    Cached: smart_scrape and the tool-guessing helpers all ask for the same URL's host.
+    """
     try:
         host = (urlparse(url).hostname or "").lower()
         # Normalize common subdomains to improve routing/heuristics.
@@ -141,33 +180,41 @@ def _classify_error(e: Exception) -> tuple[str, str]:
     return "task_failed", "E3001"
 
 
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_WS_RE = re.compile(r"\s+")
+_META_DESC_RE = re.compile(r'<meta[^>]+name=["\']description["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+_OG_TITLE_RE = re.compile(r'<meta[^>]+property=["\']og:title["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+_OG_DESC_RE = re.compile(r'<meta[^>]+property=["\']og:description["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+_JSONLD_RE = re.compile(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+
+
 def _extract_structured_from_html(html: str) -> dict[str, Any]:
     """Lightweight HTML -> structured metadata (no LLM)."""
     out: dict[str, Any] = {}
     low = html.lower()
 
     # title
-    m = re.search(r"<title[^>]*>(.*?)</title>", html, flags=re.IGNORECASE | re.DOTALL)
+    m = _TITLE_RE.search(html)
     if m:
-        title = re.sub(r"\s+", " ", m.group(1)).strip()
+        title = _WS_RE.sub(" ", m.group(1)).strip()
         out["title"] = title
 
     # meta description
-    m = re.search(r'<meta[^>]+name=["\']description["\'][^>]+content=["\']([^"\']+)["\']', html, flags=re.IGNORECASE)
+    m = _META_DESC_RE.search(html)
     if m:
         out["description"] = m.group(1).strip()
 
     # og:title / og:description
-    m = re.search(r'<meta[^>]+property=["\']og:title["\'][^>]+content=["\']([^"\']+)["\']', html, flags=re.IGNORECASE)
+    m = _OG_TITLE_RE.search(html)
     if m:
         out["og_title"] = m.group(1).strip()
-    m = re.search(r'<meta[^>]+property=["\']og:description["\'][^>]+content=["\']([^"\']+)["\']', html, flags=re.IGNORECASE)
+    m = _OG_DESC_RE.search(html)
     if m:
         out["og_description"] = m.group(1).strip()
 
     # json-ld blocks (first 3, best-effort json parse)
     jsonlds: list[Any] = []
-    for m in re.finditer(r'<script[^>]+type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', html, flags=re.IGNORECASE | re.DOTALL):
+    for m in _JSONLD_RE.finditer(html):
         raw = m.group(1).strip()
         if not raw:
             continue
@@ -379,9 +426,38 @@ def _normalize_record(record: Any, *, url: str | None = None) -> dict[str, Any]:
 
 
 async def _fetch_json_preview(download_url: str, *, max_chars: int = 20_000) -> dict[str, Any]:
-    """Fetch a small JSON preview from a download URL (best-effort, token-safe)."""
+    """Fetch a small JSON preview from a download URL (best-effort, token-safe).
+
+    Successful previews are kept in a small TTL'd LRU; failures are always retried.
+    """
+    key = (download_url, max_chars)
+    cached = _PREVIEW_CACHE.get(key)
+    if cached is not None:
+        expires, preview = cached
+        if expires > time.monotonic():
+            _PREVIEW_CACHE.move_to_end(key)
+            return copy.deepcopy(preview)
+        del _PREVIEW_CACHE[key]
+    out = await _download_json_preview(download_url, max_chars=max_chars)
+    if out.get("ok") is True:
+        _PREVIEW_CACHE[key] = (time.monotonic() + _PREVIEW_CACHE_TTL, copy.deepcopy(out))
+        if len(_PREVIEW_CACHE) > _PREVIEW_CACHE_SIZE:
+            _PREVIEW_CACHE.popitem(last=False)
+    return out
+
+
+async def _download_json_preview(download_url: str, *, max_chars: int) -> dict[str, Any]:
+    """Download and decode the head of a JSON result file.
+
+    ``max_chars`` (and the 200K hard cap) count bytes of the UTF-8 body, which
+    equals characters for ASCII JSON. Reads stop at ``max_chars`` exactly and only
+    continue past it, up to the hard cap, while the first array element is still
+    incomplete. ``max_chars`` below 1 is treated as 1. ``truncated`` is set unless
+    the whole body was decoded.
+    """
     if not download_url:
         return {"ok": False, "error": "missing_download_url"}
+    max_chars = max(1, max_chars)
     def _first_object_from_array_prefix(s: str) -> dict[str, Any] | None:
         """Best-effort parse of the first JSON object in a JSON array prefix.
 
@@ -421,7 +497,7 @@ async def _fetch_json_preview(download_url: str, *, max_chars: int = 20_000) ->
                     if begun and depth == 0:
                         snippet = s[start : i + 1]
                         try:
-                            obj = json.loads(snippet)
+                            obj = loads_json(snippet)
                             return obj if isinstance(obj, dict) else None
                         except Exception:
                             return None
@@ -434,31 +510,36 @@ async def _fetch_json_preview(download_url: str, *, max_chars: int = 20_000) ->
                 # Stream small preview to avoid truncating mid-string (which breaks JSON parsing).
                 # We'll try to extract the first object from an array response, reading up to a hard cap.
                 hard_cap = max(max_chars, 200_000)
-                buf_parts: list[str] = []
-                total = 0
+                # Accumulate raw bytes and decode whole prefixes, so multi-byte
+                # characters split across chunk boundaries are not dropped.
+                buf = bytearray()
                 first_obj: dict[str, Any] | None = None
-
-                async for chunk in resp.content.iter_chunked(16_384):
-                    try:
-                        part = chunk.decode("utf-8", errors="ignore")
-                    except Exception:
-                        part = str(chunk)
-                    buf_parts.append(part)
-                    total += len(part)
-                    if total >= max_chars:
+                eof = False
+
+                while len(buf) < hard_cap:
+                    # Never read past the soft cap in one go; past it, chunks run up to the hard cap.
+                    limit = max_chars if len(buf) < max_chars else hard_cap
+                    chunk = await resp.content.read(min(_PREVIEW_CHUNK_BYTES, limit - len(buf)))
+                    if not chunk:
+                        eof = True
+                        break
+                    buf += chunk
+                    if len(buf) >= max_chars:
                         # As soon as we reach the soft cap, try to parse first object.
-                        joined = "".join(buf_parts)
-                        first_obj = _first_object_from_array_prefix(joined)
+                        first_obj = _first_object_from_array_prefix(buf.decode("utf-8", errors="ignore"))
                         if first_obj is not None:
                             break
-                    if total >= hard_cap:
-                        break
 
-                txt = "".join(buf_parts)
-                truncated = total >= hard_cap or len(txt) > max_chars
+                truncated = not eof
                 try:
-                    data = json.loads(txt)
+                    # Parsed straight from the byte buffer; no intermediate str copy on success.
+                    data = loads_json(buf)
+                    # A strict prefix of an array/object never parses, so the body was
+                    # complete even if the stream was not read to EOF; a bare scalar
+                    # (e.g. a number) could still be a cut-off prefix.
+                    truncated = truncated and not isinstance(data, (dict, list))
                 except Exception:
+                    txt = buf.decode("utf-8", errors="ignore")
                     if first_obj is None:
                         first_obj = _first_object_from_array_prefix(txt)
                     if first_obj is not None:
@@ -500,14 +581,19 @@ def _candidate_tools_for_url(url: str, *, limit: int = 3) -> list[str]:
     
     Returns empty list if no good matches found (to avoid false positives).
     """
+    return list(_candidate_tool_keys(url, limit))
+
+
+@lru_cache(maxsize=1024)
+def _candidate_tool_keys(url: str, limit: int) -> tuple[str, ...]:
+    """Cached scan behind _candidate_tools_for_url; the tool registry is fixed once loaded."""
     host = _hostname(url)
     if not host:
-        return []
+        return ()
 
     # Skip generic/example domains that shouldn't use Web Scraper tools
-    generic_domains = {"example.com", "example.org", "example.net", "test.com", "localhost"}
-    if host in generic_domains or host.endswith(".example.com"):
-        return []
+    if host in _GENERIC_DOMAINS or host.endswith(".example.com"):
+        return ()
 
     tools, _ = _ensure_tools()
     scored: list[tuple[int, str]] = []
@@ -612,7 +698,7 @@ def _candidate_tools_for_url(url: str, *, limit: int = 3) -> list[str]:
         uniq.append(k)
         if len(uniq) >= max(0, limit):
             break
-    return uniq
+    return tuple(uniq)
 
 
 def _guess_tool_for_url(url: str) -> tuple[str | None, dict[str, Any]]:
@@ -692,14 +778,11 @@ async def _run_web_scraper_tool(
             message="Unknown tool key. Use web_scraper.catalog to discover valid keys.",
         )
 
-    # VideoToolRequest common_settings dict -> CommonSettings (DX improvement)
-    from thordata.tools.base import VideoToolRequest
-    from thordata.types.common import CommonSettings
-
     # IMPORTANT: keep a JSON-serializable copy for response "input"
     params_for_input: dict[str, Any] = dict(params or {})
 
-    if issubclass(t, VideoToolRequest) and "common_settings" in params:
+    # VideoToolRequest common_settings dict -> CommonSettings (DX improvement)
+    if tool in _VIDEO_TOOL_KEYS and "common_settings" in params:
         cs_dict = params.pop("common_settings", {})
         if isinstance(cs_dict, dict):
             params["common_settings"] = CommonSettings(**cs_dict)
@@ -720,7 +803,7 @@ async def _run_web_scraper_tool(
                 # ensure JSON-safe
                 status_s = str(status)
                 result["status"] = status_s
-                if status_s.strip().lower() in {"ready", "success", "finished", "succeeded", "task succeeded", "task_succeeded"}:
+                if status_s.strip().lower() in TASK_SUCCESS_STATUSES:
                     download_url = await client.get_task_result(task_id, file_type=file_type)
                     result["download_url"] = enrich_download_url(download_url, task_id=task_id, file_type=file_type)
             except TimeoutError:
@@ -880,7 +963,6 @@ def register(mcp: FastMCP) -> None:
     ) -> dict[str, Any]:
         concurrency = max(1, min(int(concurrency), 20))
         client = await ServerContext.get_client()
-        sem = asyncio.Semaphore(concurrency)
         fmt = (format or "json").strip().lower()
         sdk_fmt = "json" if fmt in {"json", "light_json", "light"} else ("both" if fmt in {"both", "json+html", "2"} else "html")
 
@@ -904,42 +986,41 @@ def register(mcp: FastMCP) -> None:
             tbm = r.get("tbm")
             ludocid = r.get("ludocid")
             kgmid = r.get("kgmid")
-            extra_params = r.get("extra_params") if isinstance(r.get("extra_params"), dict) else {}
+            ep = r.get("extra_params")
+            extra_params = dict(ep) if isinstance(ep, dict) else {}
             ai_overview = r.get("ai_overview")
             if ai_overview is not None:
-                extra_params = dict(extra_params)
                 extra_params["ai_overview"] = ai_overview
-            async with sem:
-                req = SerpRequest(
-                    query=q,
-                    engine=getattr(Engine, str(eng).upper(), Engine.GOOGLE),
-                    num=num,
-                    start=start,
-                    device=device,
-                    output_format=sdk_fmt,
-                    render_js=render_js if isinstance(render_js, bool) or render_js is None else None,
-                    no_cache=no_cache if isinstance(no_cache, bool) or no_cache is None else None,
-                    google_domain=google_domain,
-                    country=gl,
-                    language=hl,
-                    countries_filter=cr,
-                    languages_filter=lr,
-                    location=location,
-                    uule=uule,
-                    search_type=tbm,
-                    ludocid=ludocid,
-                    kgmid=kgmid,
-                    extra_params=extra_params,
-                )
-                # Use new namespace API
-                data = await client.serp.search_advanced(req)
-                out: Any = data
-                if fmt in {"light_json", "light"}:
-                    out = _to_light_json(data)
-                return {"index": i, "ok": True, "q": q, "output": out}
-
-        await safe_ctx_info(ctx, f"SERP batch_search count={len(requests)} concurrency={concurrency} format={format}")
-        results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+            req = SerpRequest(
+                query=q,
+                engine=getattr(Engine, str(eng).upper(), Engine.GOOGLE),
+                num=num,
+                start=start,
+                device=device,
+                output_format=sdk_fmt,
+                render_js=render_js if isinstance(render_js, bool) or render_js is None else None,
+                no_cache=no_cache if isinstance(no_cache, bool) or no_cache is None else None,
+                google_domain=google_domain,
+                country=gl,
+                language=hl,
+                countries_filter=cr,
+                languages_filter=lr,
+                location=location,
+                uule=uule,
+                search_type=tbm,
+                ludocid=ludocid,
+                kgmid=kgmid,
+                extra_params=extra_params,
+            )
+            # Use new namespace API
+            data = await client.serp.search_advanced(req)
+            out: Any = data
+            if fmt in {"light_json", "light"}:
+                out = _to_light_json(data)
+            return {"index": i, "ok": True, "q": q, "output": out}
+
+        await safe_ctx_info(ctx, "SERP batch_search count=%s concurrency=%s format=%s", len(requests), concurrency, format)
+        results = await map_bounded(_one, requests, concurrency=concurrency)
         return ok_response(tool="serp.batch_search", input={"count": len(requests), "concurrency": concurrency, "format": format}, output={"results": results})
 
     # -------------------------
@@ -969,7 +1050,8 @@ def register(mcp: FastMCP) -> None:
         kwargs = extra_params or {}
         fmt = (output_format or "html").strip().lower()
         # markdown is a presentation format; fetch html then convert
-        fetch_format = "html" if fmt in {"markdown", "md"} else fmt
+        is_markdown = fmt in _MARKDOWN_FMTS
+        fetch_format = "html" if is_markdown else fmt
 
         # Use new namespace API
         data = await client.universal.scrape_async(
@@ -984,9 +1066,8 @@ def register(mcp: FastMCP) -> None:
         )
 
         if fetch_format == "png":
-            import base64
             if isinstance(data, (bytes, bytearray)):
-                png_base64 = base64.b64encode(data).decode("utf-8")
+                png_base64 = encode_png_base64(data)
                 size = len(data)
             else:
                 png_base64 = str(data)
@@ -1008,9 +1089,8 @@ def register(mcp: FastMCP) -> None:
             )
 
         html = str(data) if not isinstance(data, str) else data
-        if fmt in {"markdown", "md"}:
-            md = html_to_markdown_clean(html)
-            md = truncate_content(md, max_length=int(max_chars))
+        if is_markdown:
+            md = html_to_markdown_clean(html, max_chars=int(max_chars))
             return ok_response(
                 tool="unlocker.fetch",
                 input={
@@ -1053,9 +1133,10 @@ def register(mcp: FastMCP) -> None:
     ) -> dict[str, Any]:
         concurrency = max(1, min(int(concurrency), 20))
         client = await ServerContext.get_client()
-        sem = asyncio.Semaphore(concurrency)
 
-        async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
+        async def _one(i: int, r: Any) -> dict[str, Any]:
+            if not isinstance(r, dict):
+                r = {}
             url = str(r.get("url", ""))
             if not url:
                 return {"index": i, "ok": False, "error": {"type": "validation_error", "message": "Missing url"}}
@@ -1071,29 +1152,28 @@ def register(mcp: FastMCP) -> None:
             if not isinstance(extra_params, dict):
                 extra_params = {}
             fmt = (output_format or "html").strip().lower()
-            fetch_format = "html" if fmt in {"markdown", "md"} else fmt
+            is_markdown = fmt in _MARKDOWN_FMTS
+            fetch_format = "html" if is_markdown else fmt
 
-            async with sem:
-                try:
-                    # Use new namespace API
-                    data = await client.universal.scrape_async(
-                        url=url,
-                        js_render=js_render,
-                        country=country,
-                        wait_for=wait_for,
-                        wait_time=wait,
-                        output_format=fetch_format,
-                        block_resources=block_resources,
-                        **extra_params,
-                    )
-                except (ThordataNetworkError, ThordataAPIError) as e:
-                    et, ec = _classify_error(e)
-                    return {"index": i, "ok": False, "url": url, "error": {"type": et, "code": ec, "message": str(e)}}
+            try:
+                # Use new namespace API
+                data = await client.universal.scrape_async(
+                    url=url,
+                    js_render=js_render,
+                    country=country,
+                    wait_for=wait_for,
+                    wait_time=wait,
+                    output_format=fetch_format,
+                    block_resources=block_resources,
+                    **extra_params,
+                )
+            except (ThordataNetworkError, ThordataAPIError) as e:
+                et, ec = _classify_error(e)
+                return {"index": i, "ok": False, "url": url, "error": {"type": et, "code": ec, "message": str(e)}}
 
             if fetch_format == "png":
-                import base64
                 if isinstance(data, (bytes, bytearray)):
-                    png_base64 = base64.b64encode(data).decode("utf-8")
+                    png_base64 = encode_png_base64(data)
                     size = len(data)
                 else:
                     png_base64 = str(data)
@@ -1101,15 +1181,14 @@ def register(mcp: FastMCP) -> None:
                 return {"index": i, "ok": True, "url": url, "output": {"png_base64": png_base64, "size": size, "format": "png"}}
 
             html = str(data) if not isinstance(data, str) else data
-            if fmt in {"markdown", "md"}:
-                md = html_to_markdown_clean(html)
-                md = truncate_content(md, max_length=max_chars)
+            if is_markdown:
+                md = html_to_markdown_clean(html, max_chars=max_chars)
                 return {"index": i, "ok": True, "url": url, "output": {"markdown": md}}
 
             return {"index": i, "ok": True, "url": url, "output": {"html": html}}
 
-        await safe_ctx_info(ctx, f"UNLOCKER batch_fetch count={len(requests)} concurrency={concurrency}")
-        results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+        await safe_ctx_info(ctx, "UNLOCKER batch_fetch count=%s concurrency=%s", len(requests), concurrency)
+        results = await map_bounded(_one, requests, concurrency=concurrency)
         return ok_response(tool="unlocker.batch_fetch", input={"count": len(requests), "concurrency": concurrency}, output={"results": results})
 
     # -------------------------
@@ -1184,15 +1263,17 @@ def register(mcp: FastMCP) -> None:
                 message="Provide task_ids",
             )
         client = await ServerContext.get_client()
-        await safe_ctx_info(ctx, f"web_scraper.status_batch count={len(task_ids)}")
-        results: list[dict[str, Any]] = []
-        for tid in task_ids[:200]:
+        await safe_ctx_info(ctx, "web_scraper.status_batch count=%s", len(task_ids))
+
+        async def _status_one(_i: int, tid: str) -> dict[str, Any]:
             try:
                 s = await client.get_task_status(tid)
-                results.append({"task_id": tid, "ok": True, "status": str(s)})
+                return {"task_id": tid, "ok": True, "status": str(s)}
             except Exception as e:
                 et, ec = _classify_error(e)
-                results.append({"task_id": tid, "ok": False, "error": {"type": et, "code": ec, "message": str(e)}})
+                return {"task_id": tid, "ok": False, "error": {"type": et, "code": ec, "message": str(e)}}
+
+        results = await map_bounded(_status_one, task_ids[:200], concurrency=_TASK_LOOKUP_CONCURRENCY)
         return ok_response(tool="web_scraper.status_batch", input={"count": len(task_ids)}, output={"results": results})
 
     @mcp.tool(name="web_scraper.wait")
@@ -1265,9 +1346,9 @@ def register(mcp: FastMCP) -> None:
                 message="Provide task_ids",
             )
         client = await ServerContext.get_client()
-        await safe_ctx_info(ctx, f"web_scraper.result_batch count={len(task_ids)} file_type={file_type} preview={preview}")
-        results: list[dict[str, Any]] = []
-        for tid in task_ids[:100]:
+        await safe_ctx_info(ctx, "web_scraper.result_batch count=%s file_type=%s preview=%s", len(task_ids), file_type, preview)
+
+        async def _result_one(_i: int, tid: str) -> dict[str, Any]:
             try:
                 dl = await client.get_task_result(tid, file_type=file_type)
                 dl = enrich_download_url(dl, task_id=tid, file_type=file_type)
@@ -1281,10 +1362,12 @@ def register(mcp: FastMCP) -> None:
                             structured = _normalize_record(data[0])
                         elif isinstance(data, dict):
                             structured = _normalize_record(data)
-                results.append({"task_id": tid, "ok": True, "download_url": dl, "preview": prev, "structured": structured})
+                return {"task_id": tid, "ok": True, "download_url": dl, "preview": prev, "structured": structured}
             except Exception as e:
                 et, ec = _classify_error(e)
-                results.append({"task_id": tid, "ok": False, "error": {"type": et, "code": ec, "message": str(e)}})
+                return {"task_id": tid, "ok": False, "error": {"type": et, "code": ec, "message": str(e)}}
+
+        results = await map_bounded(_result_one, task_ids[:100], concurrency=_TASK_LOOKUP_CONCURRENCY)
         return ok_response(tool="web_scraper.result_batch", input={"count": len(task_ids), "file_type": file_type, "preview": preview}, output={"results": results})
 
     @mcp.tool(name="web_scraper.cancel")
@@ -1320,8 +1403,8 @@ def register(mcp: FastMCP) -> None:
         if params is None:
             if param_json:
                 try:
-                    params = json.loads(param_json)
-                except json.JSONDecodeError as e:
+                    params = loads_json(param_json)
+                except ValueError as e:
                     return error_response(tool="web_scraper.run", input={"tool": tool, "param_json": param_json}, error_type="json_error", code="E4002", message=str(e))
             else:
                 params = {}
@@ -1339,7 +1422,6 @@ def register(mcp: FastMCP) -> None:
         ctx: Optional[Context] = None,
     ) -> dict[str, Any]:
         concurrency = max(1, min(int(concurrency), 20))
-        sem = asyncio.Semaphore(concurrency)
 
         def _compact(out: dict[str, Any]) -> dict[str, Any]:
             # Avoid huge payloads in batch responses; keep only key fields
@@ -1353,7 +1435,9 @@ def register(mcp: FastMCP) -> None:
                 return {**out, "error": keep_e}
             return out
 
-        async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
+        async def _one(i: int, r: Any) -> dict[str, Any]:
+            if not isinstance(r, dict):
+                r = {}
             tool = str(r.get("tool", ""))
             if not tool:
                 return {"index": i, "ok": False, "error": {"type": "validation_error", "message": "Missing tool"}}
@@ -1362,21 +1446,20 @@ def register(mcp: FastMCP) -> None:
             if params is None:
                 if isinstance(param_json, str) and param_json:
                     try:
-                        params = json.loads(param_json)
-                    except json.JSONDecodeError as e:
+                        params = loads_json(param_json)
+                    except ValueError as e:
                         return {"index": i, "ok": False, "error": {"type": "json_error", "message": str(e)}}
                 else:
                     params = {}
             if not isinstance(params, dict):
                 params = {}
-            async with sem:
-                out = await _run_web_scraper_tool(tool=tool, params=params, wait=wait, max_wait_seconds=max_wait_seconds, file_type=file_type, ctx=ctx)
-                if isinstance(out, dict):
-                    out = _compact(out)
-                return {"index": i, **out}
-
-        await safe_ctx_info(ctx, f"web_scraper.batch_run count={len(requests)} concurrency={concurrency}")
-        results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+            out = await _run_web_scraper_tool(tool=tool, params=params, wait=wait, max_wait_seconds=max_wait_seconds, file_type=file_type, ctx=ctx)
+            if isinstance(out, dict):
+                out = _compact(out)
+            return {"index": i, **out}
+
+        await safe_ctx_info(ctx, "web_scraper.batch_run count=%s concurrency=%s", len(requests), concurrency)
+        results = await map_bounded(_one, requests, concurrency=concurrency)
         return ok_response(tool="web_scraper.batch_run", input={"count": len(requests), "concurrency": concurrency, "wait": wait, "file_type": file_type}, output={"results": results})
 
     # -------------------------
@@ -1445,11 +1528,10 @@ def register(mcp: FastMCP) -> None:
                 await safe_ctx_info(ctx, f"smart_scrape: SERP routing failed, falling back. err={e}")
         # Skip Web Scraper for Google search URLs (better handled by SERP or Unlocker)
         skip_web_scraper = False
-        generic_domains = {"example.com", "example.org", "example.net", "test.com", "localhost"}
         if host == "google.com" and "/search" in url_lower:
             await safe_ctx_info(ctx, f"smart_scrape: Google search URL detected, skipping Web Scraper and using Unlocker")
             skip_web_scraper = True
-        elif host in generic_domains or (host and host.endswith(".example.com")):
+        elif host in _GENERIC_DOMAINS or (host and host.endswith(".example.com")):
             await safe_ctx_info(ctx, f"smart_scrape: Generic domain {host} detected, skipping Web Scraper and using Unlocker")
             skip_web_scraper = True
         
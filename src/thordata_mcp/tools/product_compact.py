@@ -1,37 +1,54 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Any, Optional
-from urllib.parse import quote, urlparse, urlunparse
-
-from thordata_mcp.tools.params_utils import create_params_error, normalize_params
+import copy
+import re
+import time
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from secrets import token_hex
+from typing import Any, Awaitable, Iterable, Optional
+from urllib.parse import parse_qs, quote, urlparse, urlunparse
+
+from thordata_mcp.tools.params_utils import create_params_error, loads_json, normalize_params
 from thordata_mcp.tools.debug import register as register_debug
 from thordata_mcp.config import get_settings
 
 from mcp.server.fastmcp import Context, FastMCP
 from thordata import ThordataAPIError, ThordataNetworkError
+from thordata.types import Engine, SerpRequest
+from thordata.types.common import CommonSettings
 
 from thordata_mcp.config import settings
 from thordata_mcp.context import ServerContext
 from thordata_mcp.monitoring import PerformanceTimer
 from thordata_mcp.utils import (
+    encode_png_base64,
+    enrich_download_url,
     error_response,
+    gather_ordered,
     handle_mcp_errors,
     html_to_markdown_clean,
+    map_bounded,
     ok_response,
     safe_ctx_info,
     truncate_content,
+    truncate_json,
 )
 
 # Tool schema helper (for catalog)
-from .utils import tool_schema  # noqa: E402
+from .utils import TASK_SUCCESS_STATUSES, matches_any_prefix_or_exact, tool_schema  # noqa: E402
 
 # Reuse battle-tested helpers from the full product module
 from .product import (  # noqa: E402
+    _GENERIC_DOMAINS,
+    _MARKDOWN_FMTS,
+    _TASK_LOOKUP_CONCURRENCY,
     _catalog,
     _candidate_tools_for_url,
     _classify_error,
+    _ensure_tools,
     _extract_structured_from_html,
     _fetch_json_preview,
     _guess_tool_for_url,
@@ -42,18 +59,436 @@ from .product import (  # noqa: E402
     _to_light_json,
 )
 
+# smart_scrape candidate filter: a tool key containing the token is dropped unless the
+# URL host contains one of the listed names (e.g. no GitHub tools for non-GitHub URLs).
+_TOOL_HOST_REQ: tuple[tuple[str, tuple[str, ...]], ...] = (
+    ("github", ("github",)),
+    ("repository", ("github", "gitlab")),
+    ("amazon", ("amazon",)),
+    ("walmart", ("walmart",)),
+)
+
+# smart_scrape unlocker_output values accepted verbatim.
+_UNLOCKER_OUTPUT_MODES: frozenset[str] = frozenset({"markdown", "md", "html"})
+
+# smart_scrape: (tool_key, host) pairs whose Web Scraper task upstream reported status
+# "failed", mapped to the monotonic time the entry expires. Retrying such a pair costs up to
+# max_wait_seconds of polling, so it is skipped until then (unless the caller passes
+# use_failure_cache=False). Tool-call errors and timeouts are not cached. Oldest entries
+# are evicted first.
+_SCRAPER_FAIL_TTL = 300.0
+_SCRAPER_FAIL_CACHE_SIZE = 1024
+_SCRAPER_FAIL_CACHE: dict[tuple[str, str], float] = {}
+
+
+def _recently_failed(tool: str, host: str) -> bool:
+    key = (tool, host)
+    expires = _SCRAPER_FAIL_CACHE.get(key)
+    if expires is None:
+        return False
+    if expires > time.monotonic():
+        return True
+    del _SCRAPER_FAIL_CACHE[key]
+    return False
+
+
+def _mark_failed(tool: str, host: str) -> None:
+    key = (tool, host)
+    # Re-insert so a refreshed entry moves to the back of the eviction order.
+    _SCRAPER_FAIL_CACHE.pop(key, None)
+    _SCRAPER_FAIL_CACHE[key] = time.monotonic() + _SCRAPER_FAIL_TTL
+    if len(_SCRAPER_FAIL_CACHE) > _SCRAPER_FAIL_CACHE_SIZE:
+        del _SCRAPER_FAIL_CACHE[next(iter(_SCRAPER_FAIL_CACHE))]
+
+# Declared CommonSettings fields; video common_settings input is filtered against these.
+_CS_FIELDS: frozenset[str] = frozenset(getattr(CommonSettings, "__dataclass_fields__", {}))
+
+
+def _common_settings_template() -> dict[str, Any]:
+    """Placeholder dict for every public CommonSettings field (video tools)."""
+    # Keep all optional keys visible; user fills what they need.
+    # default is always None in SDK, keep placeholder to make schema explicit
+    try:
+        cs_fields = getattr(CommonSettings, "__dataclass_fields__", {})  # type: ignore[attr-defined]
+        return {ck: f"<{ck}>" for ck in cs_fields if not ck.startswith("_")}
+    except Exception:
+        # Fall back to a generic dict placeholder if SDK shape changes.
+        return {}
+
+
+# CommonSettings is introspected once at import; templates are memoized per tool_key.
+_CS_TEMPLATE: dict[str, Any] = _common_settings_template()
+_PARAMS_TEMPLATE_CACHE: dict[str, dict[str, Any]] = {}
+
+# Compact tool surface: everything that can be exposed, and the default-on subset.
+_ALL_TOOLS: frozenset[str] = frozenset({
+    "search_engine",
+    "search_engine_batch",
+    "serp",
+    "unlocker",
+    "unlocker_batch",
+    "web_scraper",
+    "web_scraper.help",
+    "browser",
+    "smart_scrape",
+})
+# Default tools: include batch operations for better productivity
+_BASE_TOOLS: frozenset[str] = frozenset({
+    "search_engine",
+    "search_engine_batch",  # Batch search enabled by default
+    "serp",  # Low-level SERP enabled by default for advanced users
+    "unlocker",
+    "unlocker_batch",  # Batch unlocker enabled by default
+    "browser",
+    "smart_scrape",
+})
+
+# Per-request keys search_engine_batch normalizes itself; everything else is forwarded to serp.
+_SEARCH_PASSTHRU_EXCLUDE: frozenset[str] = frozenset({"q", "query", "engine", "num"})
+
+# Backend contract nuance: for engine=google, tbm-style modes are routed to dedicated engines.
+_TBM_TO_ENGINE: dict[str, str] = {
+    "images": "google_images",
+    "news": "google_news",
+    "videos": "google_videos",
+    "shops": "google_shopping",
+    "shopping": "google_shopping",
+}
+# Common singular aliases for tbm values (kept in backend naming, not Google UI isch/nws/...).
+_TBM_ALIAS: dict[str, str] = {"image": "images", "video": "videos", "shop": "shops"}
+# User-facing SERP format -> SDK output_format; anything unknown is "html".
+_FMT_TO_SDK: dict[str, str] = {
+    "json": "json",
+    "light_json": "json",
+    "light": "json",
+    "both": "both",
+    "json+html": "both",
+    "2": "both",
+}
+_LIGHT_FMTS: frozenset[str] = frozenset({"light_json", "light"})
+
+# Query characters that upstream SERP often rejects (checked in order for stable diagnostics).
+_SERP_SPECIAL_CHARS = "@#$%^&*()[]{}|\\:;\"'<>?/~`"
+
+# Static parts of the "Invalid tbm" error details; only referenced when that error fires.
+_TBM_ERROR_HINT = (
+    "The upstream SERP endpoint rejected 'tbm'. Try removing tbm/search_type, or use engine-specific modes "
+    "(e.g. google_images/google_news/google_videos/google_shopping)."
+)
+# Immutable source for the error "examples"; each response gets its own list copies.
+_TBM_ERROR_EXAMPLES: dict[str, tuple[str, ...]] = {
+    "engine": ("google", "google_images", "google_news", "google_videos", "google_shopping"),
+    "tbm": ("images", "news", "videos", "shops", "local", "patents"),
+}
+
+# Dashboard-style SERP parameters forwarded verbatim via SerpRequest.extra_params.
+_SERP_PASSTHRU_KEYS: tuple[str, ...] = ("safe", "nfpr", "filter", "tbs", "ibp", "lsig", "si", "uds")
+
+# Optional serp params (user/dashboard name -> SerpRequest field); only non-None values are passed.
+_SERP_OPT_MAP: dict[str, str] = {
+    "device": "device",
+    "render_js": "render_js",
+    "no_cache": "no_cache",
+    "google_domain": "google_domain",
+    "gl": "country",
+    "hl": "language",
+    "cr": "countries_filter",
+    "lr": "languages_filter",
+    "location": "location",
+    "uule": "uule",
+    "tbm": "search_type",
+    "ludocid": "ludocid",
+    "kgmid": "kgmid",
+}
+
+
+def _build_serp_request(src: dict[str, Any], **required: Any) -> SerpRequest:
+    """Build a SerpRequest from explicit fields plus the non-None optional params in ``src``.
+
+    Explicitly passed fields win over the same field mapped from ``src``.
+    """
+    kwargs = required
+    for k_in, k_req in _SERP_OPT_MAP.items():
+        v = src.get(k_in)
+        if v is not None and k_req not in kwargs:
+            kwargs[k_req] = v
+    return SerpRequest(**kwargs)
+
+
+def _norm(value: Any, default: str = "") -> tuple[str, str]:
+    """Return ``(stripped, lowered)`` for a string-ish param, falling back to ``default`` when empty."""
+    raw = (value if isinstance(value, str) else ("" if value is None else str(value))).strip() or default
+    return raw, raw.lower()
+
+
+def _as_int(src: dict[str, Any], key: str, default: int) -> int:
+    """Read an int param, returning ``default`` when missing or empty.
+
+    Bools and values ``int()`` rejects raise ValueError naming the key.
+    """
+    v = src.get(key)
+    if type(v) is int:
+        return v
+    if v is None or v == "":
+        return default
+    if not isinstance(v, bool):
+        try:
+            return int(v)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError(f"{key} must be an integer, got {v!r}")
+
+
+def _preview_max_chars(src: dict[str, Any]) -> int:
+    """Read preview_max_chars, clamped to 1..100000 like smart_scrape's range check."""
+    return max(1, min(_as_int(src, "preview_max_chars", 20_000), 100_000))
+
+
+_ORGANIC_FIELDS = itemgetter("title", "link", "description")
+
+
+def _map_organic(organic: list[Any], *, require_title_or_link: bool = False) -> list[dict[str, Any]]:
+    """Reduce SERP organic rows to the minimal title/link/description shape."""
+    mapped: list[dict[str, Any]] = []
+    append = mapped.append
+    for r in organic:
+        if not isinstance(r, dict):
+            continue
+        try:
+            # C-level fetch of all three keys; the common case when upstream fills them.
+            title, link, description = _ORGANIC_FIELDS(r)
+        except KeyError:
+            title, link, description = r.get("title"), r.get("link"), r.get("description")
+        if require_title_or_link and not (title or link):
+            continue
+        append({"title": title, "link": link, "description": description})
+    return mapped
+
+
+_EMPTY_NOTE_NON_ASCII = "No results found. This may be due to API limitations with Chinese queries. Try using English queries or different search parameters."
+_EMPTY_NOTE_BING = "No results found. Bing API may have limitations or rate limits. Try using Google engine or different query."
+_EMPTY_NOTE_DEFAULT = "No results found. This may be due to API limitations, rate limits, or the query not matching any results."
+
+
+def _search_batch_item(item: dict[str, Any]) -> dict[str, Any]:
+    """Map one serp batch_search result to the search_engine_batch item shape."""
+    try:
+        organic = item["output"]["organic"]
+    except (TypeError, KeyError):
+        organic = None
+    mapped = _map_organic(organic) if isinstance(organic, list) else []
+
+    # Check for empty results and add note
+    note = None
+    if not mapped:
+        query_text = item.get("q") or ""
+        # Check if it's a Chinese query or Bing engine
+        if not query_text.isascii():  # Contains non-ASCII (likely Chinese)
+            note = _EMPTY_NOTE_NON_ASCII
+        elif (item.get("engine") or "").lower() == "bing":
+            note = _EMPTY_NOTE_BING
+        else:
+            note = _EMPTY_NOTE_DEFAULT
+
+    ok = bool(item.get("ok"))
+    return {
+        "index": item.get("index"),
+        "ok": ok,
+        "input": {"q": item.get("q"), "engine": item.get("engine"), "num": item.get("num")},
+        "results": mapped if ok else None,
+        "error": item.get("error") if not ok else None,
+        "note": note,
+    }
+
+
+# Unlocker markdown output is converted from HTML; these are always stripped first.
+_MARKDOWN_CLEAN_CONTENT: tuple[str, ...] = ("js", "css")
+
+# SDK errors raised when the Universal API answers with an HTML gateway page instead of JSON.
+_NON_JSON_ERR_RE = re.compile(r"Attempt to decode JSON|unexpected mimetype: text/html")
+_STATUS_PATH_RE = re.compile(r"/status/(\d+)")
+_CSV_SPLIT_RE = re.compile(r"\s*,\s*")
+# smart_scrape Unlocker failures: a 504 gets its own message, checked before the generic timeout.
+_GATEWAY_TIMEOUT_RE = re.compile(r"504|Gateway Timeout")
+_TIMEOUT_RE = re.compile(r"timeout", re.IGNORECASE)
+
+
+def _is_non_json_upstream_error(msg: str) -> bool:
+    return _NON_JSON_ERR_RE.search(msg) is not None
+
+
+def _parse_csv(raw: Any) -> list[str]:
+    """Split a comma-separated option string into trimmed, non-empty items."""
+    if not isinstance(raw, str):
+        return []
+    return [x for x in _CSV_SPLIT_RE.split(raw.strip()) if x]
+
+
+def _with_markdown_clean_content(raw: Any) -> str:
+    """Return clean_content with the markdown defaults (js, css) appended if missing."""
+    parts = _parse_csv(raw)
+    present = set(parts)
+    parts.extend(x for x in _MARKDOWN_CLEAN_CONTENT if x not in present)
+    return ",".join(parts)
+
+
+def _google_search_query(url: str) -> tuple[bool, str | None]:
+    """Return (True, q) for a google.com/search?q=... URL, else (False, None).
+
+    Most URLs are rejected by a substring check before any URL parsing happens.
+    """
+    if "google.com" not in url.lower():
+        return (False, None)
+    try:
+        p0 = urlparse(url)
+        h0 = (p0.hostname or "").lower()
+        if h0.startswith("www."):
+            h0 = h0[4:]
+        if h0 != "google.com" or p0.path != "/search":
+            return (False, None)
+        q0 = (parse_qs(p0.query or "").get("q") or [""])[0].strip()
+        return (bool(q0), q0 or None)
+    except Exception:
+        return (False, None)
+
+
+def _normalize_unlocker_url(url: str) -> str:
+    """Percent-encode path segments and query pairs; fall back to the raw URL on parse errors."""
+    try:
+        parsed = urlparse(url)
+        # Encode path and query components to handle special characters
+        if parsed.path:
+            encoded_path = "/".join(quote(part, safe="/") for part in parsed.path.split("/"))
+        else:
+            encoded_path = parsed.path
+
+        if parsed.query:
+            query_parts = []
+            for param in parsed.query.split("&"):
+                if "=" in param:
+                    key, value = param.split("=", 1)
+                    query_parts.append(f"{quote(key, safe='')}={quote(value, safe='')}")
+                else:
+                    query_parts.append(quote(param, safe=""))
+            encoded_query = "&".join(query_parts)
+        else:
+            encoded_query = parsed.query
+
+        return urlunparse((parsed.scheme, parsed.netloc, encoded_path, parsed.params, encoded_query, parsed.fragment))
+    except Exception:
+        # If URL parsing fails, use original URL (let SDK handle it)
+        return url
+
+
+def _unlocker_scrape_kwargs(src: dict[str, Any], *, is_markdown: bool, **core: Any) -> dict[str, Any]:
+    """Build the full ``universal.scrape_async`` kwargs for an unlocker request.
+
+    Advanced options from ``src`` are layered over its extra_params, then the
+    explicit ``core`` arguments are added. extra_params keys that name a core
+    argument raise ValueError instead of being silently overridden. The
+    caller's extra_params dict is copied, never mutated.
+    """
+    base = src.get("extra_params")
+    extra_params: dict[str, Any] = dict(base) if isinstance(base, dict) else {}
+    collisions = sorted(k for k in extra_params if k in core)
+    if collisions:
+        raise ValueError(
+            f"extra_params must not set {', '.join(collisions)}; pass them as top-level request fields instead"
+        )
+    follow_redirect = src.get("follow_redirect")
+    if follow_redirect is not None:
+        extra_params["follow_redirect"] = follow_redirect
+    for key in ("clean_content", "headers", "cookies"):
+        value = src.get(key)
+        if value:
+            extra_params[key] = value
+    if is_markdown:
+        # Auto-add clean_content for markdown
+        extra_params["clean_content"] = _with_markdown_clean_content(extra_params.get("clean_content"))
+    extra_params.update(core)
+    return extra_params
+
+
+def _classify_unlocker_error(e: Exception, normalized_url: str) -> tuple[str, str, str, int | None]:
+    """Return (error_type, code, message, status_code) for an unlocker SDK error."""
+    et, ec = _classify_error(e)
+    error_msg = str(e)
+    low = error_msg.lower()
+    if "404" in error_msg or "not found" in low:
+        return "not_found", "E3003", f"Page not found (404): {normalized_url}", 404
+    if "500" in error_msg or "internal server error" in low:
+        return "upstream_internal_error", "E2106", f"Server error (500): {normalized_url}", 500
+    if "403" in error_msg or "forbidden" in low:
+        return "permission_denied", "E1004", f"Access forbidden (403): {normalized_url}", 403
+    if "400" in error_msg or "bad request" in low:
+        return (
+            "validation_error",
+            "E4001",
+            f"Bad request (400): {normalized_url}. This may be due to special characters in the URL.",
+            400,
+        )
+    return et, ec, error_msg, None
+
+
+@lru_cache(maxsize=4)
+def _parse_allowlist(raw: str) -> tuple[str, ...]:
+    """Lower-cased THORDATA_TASKS_ALLOWLIST entries for matches_any_prefix_or_exact (parsed once)."""
+    return tuple(x.lower() for x in _parse_csv(raw))
+
+
+@lru_cache(maxsize=512)
+def _required_fields(tool: str) -> tuple[tuple[str, Any], ...] | None:
+    """(field, placeholder) pairs for a tool's required params; None for unknown tools.
+
+    Container fields map to the dict/list type itself (instantiated fresh per
+    call by _field_placeholder), others to their default or "<field>".
+    """
+    _, tools_map = _ensure_tools()
+    t = tools_map.get(tool)
+    if t is None:
+        return None
+    out: list[tuple[str, Any]] = []
+    for key, meta in tool_schema(t).get("fields", {}).items():
+        # SPIDER_ID/SPIDER_NAME are class constants, not user params (see _build_params_template).
+        if key in ("SPIDER_ID", "SPIDER_NAME") or not meta.get("required"):
+            continue
+        default = meta.get("default")
+        typ = str(meta.get("type", "")).lower()
+        if "dict" in typ:
+            placeholder: Any = dict
+        elif "list" in typ:
+            placeholder = list
+        elif default is not None:
+            placeholder = default
+        else:
+            placeholder = f"<{key}>"
+        out.append((key, placeholder))
+    return tuple(out)
+
+
+def _field_placeholder(placeholder: Any) -> Any:
+    return placeholder() if placeholder is dict or placeholder is list else placeholder
+
+
 def _build_params_template(schema: dict[str, Any]) -> dict[str, Any]:
     """Build a minimal runnable params template from a tool_schema() dict.
 
     We do NOT include URL examples; we only provide placeholders and defaults.
+    Templates are cached per tool_key; every call returns a fresh deep copy.
     """
     fields = schema.get("fields") if isinstance(schema, dict) else None
     if not isinstance(fields, dict):
         return {}
 
+    cache_key = schema.get("tool_key")
+    if isinstance(cache_key, str):
+        cached = _PARAMS_TEMPLATE_CACHE.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
     template: dict[str, Any] = {}
     for k, meta in fields.items():
-        if k in {"SPIDER_ID", "SPIDER_NAME"}:
+        if k in ("SPIDER_ID", "SPIDER_NAME"):
             continue
         if not isinstance(meta, dict):
             continue
@@ -63,21 +498,7 @@ def _build_params_template(schema: dict[str, Any]) -> dict[str, Any]:
 
         # Always special-case common_settings for video tools, regardless of required/optional.
         if k == "common_settings":
-            try:
-                from thordata.types.common import CommonSettings
-
-                cs_fields = getattr(CommonSettings, "__dataclass_fields__", {})  # type: ignore[attr-defined]
-                cs_template: dict[str, Any] = {}
-                for ck, cf in cs_fields.items():
-                    # Keep all optional keys visible; user fills what they need.
-                    if ck.startswith("_"):
-                        continue
-                    # default is always None in SDK, keep placeholder to make schema explicit
-                    cs_template[ck] = f"<{ck}>"
-                template[k] = cs_template
-            except Exception:
-                # Fall back to a generic dict placeholder if SDK shape changes.
-                template[k] = {}
+            template[k] = dict(_CS_TEMPLATE)
             continue
 
         # For required fields without defaults, provide a clear placeholder.
@@ -97,6 +518,8 @@ def _build_params_template(schema: dict[str, Any]) -> dict[str, Any]:
             template[k] = []
         # else: omit
 
+    if isinstance(cache_key, str):
+        _PARAMS_TEMPLATE_CACHE[cache_key] = copy.deepcopy(template)
     return template
 
 
@@ -124,6 +547,11 @@ def register(mcp: FastMCP) -> None:
     groups = [g.strip().lower() for g in (getattr(cfg, "THORDATA_GROUPS", "") or "").split(",") if g.strip()]
     tools = [t.strip().lower() for t in (getattr(cfg, "THORDATA_TOOLS", "") or "").split(",") if t.strip()]
 
+    # web_scraper catalog settings; parsed once here since settings are fixed per process.
+    catalog_mode = str(getattr(cfg, "THORDATA_TASKS_LIST_MODE", "curated") or "curated").strip().lower()
+    catalog_groups = tuple(g.strip().lower() for g in (getattr(cfg, "THORDATA_TASKS_GROUPS", "") or "").split(",") if g.strip())
+    catalog_limit_default = int(getattr(cfg, "THORDATA_TASKS_LIST_DEFAULT_LIMIT", 60) or 60)
+
     # Register debug helper tools (read-only) only when enabled
     if getattr(cfg, "THORDATA_DEBUG_TOOLS", False):
         register_debug(mcp)
@@ -131,39 +559,17 @@ def register(mcp: FastMCP) -> None:
     # Decide which tools to register.
     # Competitor-style defaults: keep tool surface small for LLMs.
     # We always expose a small base set; advanced tools require explicit allowlisting via THORDATA_TOOLS.
-    all_tools = {
-        "search_engine",
-        "search_engine_batch",
-        "serp",
-        "unlocker",
-        "unlocker_batch",
-        "web_scraper",
-        "web_scraper.help",
-        "browser",
-        "smart_scrape",
-    }
-    # Default tools: include batch operations for better productivity
-    base_tools = {
-        "search_engine",
-        "search_engine_batch",  # Batch search enabled by default
-        "serp",  # Low-level SERP enabled by default for advanced users
-        "unlocker",
-        "unlocker_batch",  # Batch unlocker enabled by default
-        "browser",
-        "smart_scrape",
-    }
 
     # Legacy note:
     # We keep THORDATA_MODE/THORDATA_GROUPS for backward-compat, but avoid relying on multi-tier modes.
     # If someone explicitly sets THORDATA_MODE=pro, we still honor it for now.
     if mode == "pro":
-        allowed_tools = set(all_tools)
+        allowed_tools = _ALL_TOOLS
     else:
-        allowed_tools = set(base_tools)
-        allowed_tools |= {t for t in tools if t in all_tools}
+        allowed_tools = _BASE_TOOLS | _ALL_TOOLS.intersection(tools)
 
-    def _allow(name: str) -> bool:
-        return name.lower() in allowed_tools
+    # Tool names below are lowercase literals, so membership needs no normalization.
+    _allow = allowed_tools.__contains__
 
     # -------------------------
     # SERP (compact)
@@ -233,10 +639,10 @@ def register(mcp: FastMCP) -> None:
                 )
 
             # Normalize basic options with defaults
-            engine = str(engine or "google").strip()
+            engine, engine_lc = _norm(engine, "google")
             num = int(num or 10)
             start = int(start or 0)
-            fmt = str(format or "light_json").strip().lower()
+            fmt = _norm(format, "light_json")[1]
             if num <= 0 or num > 50:
                 return error_response(
                     tool="search_engine",
@@ -295,16 +701,7 @@ def register(mcp: FastMCP) -> None:
             results = []
             if isinstance(organic, list):
                 # Limit results to requested num to avoid unnecessary processing
-                # Use list comprehension for better performance
-                results = [
-                    {
-                        "title": r.get("title"),
-                        "link": r.get("link"),
-                        "description": r.get("description"),
-                    }
-                    for r in organic[:num]
-                    if isinstance(r, dict) and (r.get("title") or r.get("link"))
-                ]
+                results = _map_organic(organic[:num], require_title_or_link=True)
 
             # Build input dict efficiently - only include non-None values
             input_dict: dict[str, Any] = {
@@ -342,7 +739,7 @@ def register(mcp: FastMCP) -> None:
                 # Provide helpful message for empty results
                 if language and ("zh" in language.lower() or "cn" in language.lower()):
                     empty_result_note = "No results found. This may be due to API limitations with Chinese queries. Try using English queries or different search parameters."
-                elif engine.lower() == "bing":
+                elif engine_lc == "bing":
                     empty_result_note = "No results found. Bing API may have limitations or rate limits. Try using Google engine or different query."
                 else:
                     empty_result_note = "No results found. This may be due to API limitations, rate limits, or the query not matching any results."
@@ -408,7 +805,7 @@ def register(mcp: FastMCP) -> None:
             concurrency = max(1, min(int(concurrency), 20))
             
             # Validate engine
-            engine = str(engine or "google").strip()
+            engine = _norm(engine, "google")[0]
             
             # Validate num
             num = int(num or 10)
@@ -422,14 +819,6 @@ def register(mcp: FastMCP) -> None:
                     details={"num": num},
                 )
             
-            # Build params dict for serp call
-            p = {
-                "requests": requests,
-                "concurrency": concurrency,
-                "engine": engine,
-                "num": num,
-            }
-            
             # Normalize requests: ensure each has q, engine, num
             default_engine = engine
             default_num = num
@@ -442,16 +831,13 @@ def register(mcp: FastMCP) -> None:
                 if not q:
                     continue
                 # Use request-specific engine/num or fallback to defaults
-                req_engine = str((r.get("engine") or default_engine)).strip()
+                req_engine = _norm(r.get("engine"), default_engine)[0]
                 req_num = int((r.get("num") or default_num))
                 if req_num <= 0 or req_num > 50:
                     req_num = default_num
-                normalized_requests.append({
-                    "q": q,
-                    "engine": req_engine,
-                    "num": req_num,
-                    **{k: v for k, v in r.items() if k not in ("q", "query", "engine", "num")},
-                })
+                nr: dict[str, Any] = {"q": q, "engine": req_engine, "num": req_num}
+                nr.update((k, v) for k, v in r.items() if k not in _SEARCH_PASSTHRU_EXCLUDE)
+                normalized_requests.append(nr)
             
             if not normalized_requests:
                 return error_response(
@@ -463,7 +849,7 @@ def register(mcp: FastMCP) -> None:
                 )
 
             # Delegate to serp.batch_search
-            await safe_ctx_info(ctx, f"search_engine_batch count={len(normalized_requests)}")
+            await safe_ctx_info(ctx, "search_engine_batch count=%s", len(normalized_requests))
             out = await serp(
                 action="batch_search",
                 params={
@@ -475,44 +861,13 @@ def register(mcp: FastMCP) -> None:
             if out.get("ok") is not True:
                 return out
 
-            data = out.get("output")
-            results = []
-            if isinstance(data, dict):
-                for item in data.get("results", []) if isinstance(data.get("results"), list) else []:
-                    if not isinstance(item, dict):
-                        continue
-                    o = item.get("output")
-                    organic = o.get("organic") if isinstance(o, dict) else None
-                    mapped = []
-                    if isinstance(organic, list):
-                        for r in organic:
-                            if not isinstance(r, dict):
-                                continue
-                            mapped.append({"title": r.get("title"), "link": r.get("link"), "description": r.get("description")})
-                    
-                    # Check for empty results and add note
-                    query_text = item.get("q") or ""
-                    has_results = len(mapped) > 0
-                    note = None
-                    if not has_results:
-                        # Check if it's a Chinese query or Bing engine
-                        if any(ord(c) > 127 for c in query_text):  # Contains non-ASCII (likely Chinese)
-                            note = "No results found. This may be due to API limitations with Chinese queries. Try using English queries or different search parameters."
-                        elif item.get("engine", "").lower() == "bing":
-                            note = "No results found. Bing API may have limitations or rate limits. Try using Google engine or different query."
-                        else:
-                            note = "No results found. This may be due to API limitations, rate limits, or the query not matching any results."
-                    
-                    results.append(
-                        {
-                            "index": item.get("index"),
-                            "ok": bool(item.get("ok")),
-                            "input": {"q": item.get("q"), "engine": item.get("engine"), "num": item.get("num")},
-                            "results": mapped if item.get("ok") else None,
-                            "error": item.get("error") if not item.get("ok") else None,
-                            "note": note,
-                        }
-                    )
+            # serp batch_search output is well-formed in the common case; look up keys directly
+            # and fall back only when the shape is unexpected.
+            try:
+                items = out["output"]["results"] or ()
+            except (TypeError, KeyError):
+                items = ()
+            results = [_search_batch_item(item) for item in items if isinstance(item, dict)]
 
             return ok_response(
                 tool="search_engine_batch",
@@ -544,16 +899,14 @@ def register(mcp: FastMCP) -> None:
         try:
             p = normalize_params(params, "serp", action)
         except ValueError as e:
-            if "JSON" in str(e):
-                return create_params_error("serp", action, params, str(e))
-            else:
-                return create_params_error("serp", action, params, str(e))
+            return create_params_error("serp", action, params, str(e))
+        req_input = {"action": action, "params": p}
         
-        a = (action or "").strip().lower()
+        a = _norm(action)[1]
         if not a:
             return error_response(
                 tool="serp",
-                input={"action": action, "params": p},
+                input=req_input,
                 error_type="validation_error",
                 code="E4001",
                 message="action is required",
@@ -565,79 +918,53 @@ def register(mcp: FastMCP) -> None:
             # Mirror serp.search product contract
             q = str(p.get("q", ""))
             if not q:
-                return error_response(tool="serp", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing q")
+                return error_response(tool="serp", input=req_input, error_type="validation_error", code="E4001", message="Missing q")
             
             # Check for special characters that might cause API errors
             # Note: The API should handle special characters, but some may cause issues
-            special_chars = set("@#$%^&*()[]{}|\\:;\"'<>?/~`")
-            detected_special = [c for c in special_chars if c in q]
+            detected_special = [c for c in _SERP_SPECIAL_CHARS if c in q]
             has_special = len(detected_special) > 0
             if has_special:
                 # Log warning but proceed - let API handle it
                 await safe_ctx_info(ctx, f"serp: Query contains special characters: {detected_special}, API may return error")
-            engine_in = str(p.get("engine", "google")).strip() or "google"
-            num = int(p.get("num", 10))
-            start = int(p.get("start", 0))
-            fmt = str(p.get("format", "json")).strip().lower()
+            engine_in, engine_in_lc = _norm(p.get("engine"), "google")
+            try:
+                num = _as_int(p, "num", 10)
+                start = _as_int(p, "start", 0)
+            except ValueError as e:
+                return error_response(tool="serp", input=req_input, error_type="validation_error", code="E4001", message=str(e))
+            fmt = _norm(p.get("format"), "json")[1]
             # Backend contract nuance:
             # - Some engines support "mode" via engine name (google_images/news/videos/shopping/ai_mode)
             # - For engine=google, passing tbm often breaks on some backends. We route to a specific engine when possible.
             tbm_raw = p.get("tbm")
             tbm_lower = tbm_raw.strip().lower() if isinstance(tbm_raw, str) else None
             engine = engine_in
-            if engine_in.lower() == "google" and tbm_lower in {"images", "news", "videos", "shops", "shopping"}:
+            if engine_in_lc == "google" and tbm_lower in _TBM_TO_ENGINE:
                 # Map tbm-style mode to dedicated engine.
-                engine_map = {
-                    "images": "google_images",
-                    "news": "google_news",
-                    "videos": "google_videos",
-                    "shops": "google_shopping",
-                    "shopping": "google_shopping",
-                }
-                engine = engine_map[tbm_lower]
+                engine = _TBM_TO_ENGINE[tbm_lower]
 
             # For engines that explicitly support tbm modes, keep tbm as-is but normalize common aliases
             # (do NOT convert to isch/nws/vid/shop here; those are Google UI tbm values and may differ from backend contract).
             if isinstance(tbm_raw, str):
-                tbm_alias = {"image": "images", "video": "videos", "shop": "shops"}
-                tbm_norm = tbm_alias.get(tbm_lower)
+                tbm_norm = _TBM_ALIAS.get(tbm_lower)
                 if tbm_norm:
                     p = dict(p)
                     p["tbm"] = tbm_norm
+                    req_input["params"] = p
             # Leverage SerpRequest mapping via SDK by calling full tool through request object
-            from thordata.types import SerpRequest
-
-            sdk_fmt = "json" if fmt in {"json", "light_json", "light"} else ("both" if fmt in {"both", "json+html", "2"} else "html")
-            extra_params = p.get("extra_params") if isinstance(p.get("extra_params"), dict) else {}
+            sdk_fmt = _FMT_TO_SDK.get(fmt, "html")
+            # Copy once up front, then fill overrides in place.
+            extra_params = p.get("extra_params")
+            extra_params = dict(extra_params) if isinstance(extra_params, dict) else {}
             if p.get("ai_overview") is not None:
-                extra_params = dict(extra_params)
                 extra_params["ai_overview"] = p.get("ai_overview")
             # Dashboard-style passthrough parameters (kept in extra_params)
-            for k in ("safe", "nfpr", "filter", "tbs", "ibp", "lsig", "si", "uds"):
-                if p.get(k) is not None:
-                    extra_params = dict(extra_params)
-                    extra_params[k] = p.get(k)
-            req = SerpRequest(
-                query=q,
-                engine=engine,
-                num=num,
-                start=start,
-                device=p.get("device"),
-                output_format=sdk_fmt,
-                render_js=p.get("render_js"),
-                no_cache=p.get("no_cache"),
-                google_domain=p.get("google_domain"),
-                country=p.get("gl"),
-                language=p.get("hl"),
-                countries_filter=p.get("cr"),
-                languages_filter=p.get("lr"),
-                location=p.get("location"),
-                uule=p.get("uule"),
-                search_type=p.get("tbm"),
-                ludocid=p.get("ludocid"),
-                kgmid=p.get("kgmid"),
-                extra_params=extra_params,
-            )
+            for k in _SERP_PASSTHRU_KEYS:
+                v = p.get(k)
+                if v is not None:
+                    extra_params[k] = v
+            req = _build_serp_request(p, query=q, engine=engine, num=num, start=start, output_format=sdk_fmt, extra_params=extra_params)
             await safe_ctx_info(ctx, f"serp.search q={q!r} engine={engine} (input={engine_in}) num={num} start={start} format={fmt}")
             try:
                 # Use new namespace API
@@ -651,7 +978,7 @@ def register(mcp: FastMCP) -> None:
                     if has_special and detected_special:
                         return error_response(
                             tool="serp",
-                            input={"action": action, "params": p},
+                            input=req_input,
                             error_type="validation_error",
                             code="E4001",
                             message=f"Query contains special characters that may not be supported: {', '.join(repr(c) for c in detected_special)}. Try removing or escaping these characters.",
@@ -669,12 +996,12 @@ def register(mcp: FastMCP) -> None:
                             "tbm": p.get("tbm"),
                             "engine": engine,
                             "engine_input": engine_in,
-                            "hint": "The upstream SERP endpoint rejected 'tbm'. Try removing tbm/search_type, or use engine-specific modes (e.g. google_images/google_news/google_videos/google_shopping).",
-                            "examples": {"engine": ["google", "google_images", "google_news", "google_videos", "google_shopping"], "tbm": ["images", "news", "videos", "shops", "local", "patents"]},
+                            "hint": _TBM_ERROR_HINT,
+                            "examples": {k: list(v) for k, v in _TBM_ERROR_EXAMPLES.items()},
                         },
                     )
                 raise
-            if fmt in {"light_json", "light"}:
+            if fmt in _LIGHT_FMTS:
                 data = _to_light_json(data)
 
             # Add diagnostics for empty/no-result responses (common UX issue)
@@ -691,118 +1018,85 @@ def register(mcp: FastMCP) -> None:
                 "organic_count": len(organic) if isinstance(organic, list) else None,
             }
 
-            if isinstance(organic, list) and len(organic) == 0:
-                return ok_response(
-                    tool="serp",
-                    input={"action": "search", "params": p},
-                    output={"_meta": meta, **data},
-                )
+            output: dict[str, Any] = {"_meta": meta}
             if isinstance(data, dict):
-                return ok_response(
-                    tool="serp",
-                    input={"action": "search", "params": p},
-                    output={"_meta": meta, **data},
-                )
-            return ok_response(tool="serp", input={"action": "search", "params": p}, output={"_meta": meta, "data": data})
+                output.update(data)
+            else:
+                output["data"] = data
+            return ok_response(tool="serp", input={"action": "search", "params": p}, output=output)
 
         if a == "batch_search":
             reqs = p.get("requests")
             if not isinstance(reqs, list) or not reqs:
-                return error_response(tool="serp", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing requests[]")
-            concurrency = int(p.get("concurrency", 5))
-            concurrency = max(1, min(concurrency, 20))
-            fmt = str(p.get("format", "json")).strip().lower()
-            sdk_fmt = "json" if fmt in {"json", "light_json", "light"} else ("both" if fmt in {"both", "json+html", "2"} else "html")
-            from thordata.types import SerpRequest
-
-            sem = asyncio.Semaphore(concurrency)
+                return error_response(tool="serp", input=req_input, error_type="validation_error", code="E4001", message="Missing requests[]")
+            try:
+                concurrency = max(1, min(_as_int(p, "concurrency", 5), 20))
+            except ValueError as e:
+                return error_response(tool="serp", input=req_input, error_type="validation_error", code="E4001", message=str(e))
+            fmt = _norm(p.get("format"), "json")[1]
+            sdk_fmt = _FMT_TO_SDK.get(fmt, "html")
 
-            async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
+            async def _one(i: int, r: Any) -> dict[str, Any]:
+                if not isinstance(r, dict):
+                    r = {}
                 q = str(r.get("q", r.get("query", "")))
                 if not q:
                     return {"index": i, "ok": False, "error": {"type": "validation_error", "message": "Missing q"}}
                 try:
-                    engine_in = str(r.get("engine", "google")).strip() or "google"
-                    num = int(r.get("num", 10))
-                    start = int(r.get("start", 0))
+                    num = _as_int(r, "num", 10)
+                    start = _as_int(r, "start", 0)
+                except ValueError as e:
+                    return {"index": i, "ok": False, "q": q, "error": {"type": "validation_error", "message": str(e)}}
+                try:
+                    engine_in, engine_in_lc = _norm(r.get("engine"), "google")
                     tbm_raw = r.get("tbm")
                     tbm_lower = tbm_raw.strip().lower() if isinstance(tbm_raw, str) else None
                     engine = engine_in
-                    if engine_in.lower() == "google" and tbm_lower in {"images", "news", "videos", "shops", "shopping"}:
-                        engine_map = {
-                            "images": "google_images",
-                            "news": "google_news",
-                            "videos": "google_videos",
-                            "shops": "google_shopping",
-                            "shopping": "google_shopping",
-                        }
-                        engine = engine_map[tbm_lower]
-                    if isinstance(tbm_raw, str):
-                        tbm_alias = {"image": "images", "video": "videos", "shop": "shops"}
-                        tbm_norm = tbm_alias.get(tbm_lower)
-                        if tbm_norm:
-                            r = dict(r)
-                            r["tbm"] = tbm_norm
-                    extra_params = r.get("extra_params") if isinstance(r.get("extra_params"), dict) else {}
+                    if engine_in_lc == "google" and tbm_lower in _TBM_TO_ENGINE:
+                        engine = _TBM_TO_ENGINE[tbm_lower]
+                    # Alias-normalized tbm is passed explicitly rather than copying r to rewrite one key.
+                    tbm = (_TBM_ALIAS.get(tbm_lower) if isinstance(tbm_raw, str) else None) or tbm_raw
+                    # Copy once up front, then fill overrides in place.
+                    extra_params = r.get("extra_params")
+                    extra_params = dict(extra_params) if isinstance(extra_params, dict) else {}
                     if r.get("ai_overview") is not None:
-                        extra_params = dict(extra_params)
                         extra_params["ai_overview"] = r.get("ai_overview")
-                    for k in ("safe", "nfpr", "filter", "tbs", "ibp", "lsig", "si", "uds"):
-                        if r.get(k) is not None:
-                            extra_params = dict(extra_params)
-                            extra_params[k] = r.get(k)
-                    async with sem:
-                        req = SerpRequest(
-                            query=q,
-                            engine=engine,
-                            num=num,
-                            start=start,
-                            device=r.get("device"),
-                            output_format=sdk_fmt,
-                            render_js=r.get("render_js"),
-                            no_cache=r.get("no_cache"),
-                            google_domain=r.get("google_domain"),
-                            country=r.get("gl"),
-                            language=r.get("hl"),
-                            countries_filter=r.get("cr"),
-                            languages_filter=r.get("lr"),
-                            location=r.get("location"),
-                            uule=r.get("uule"),
-                            search_type=r.get("tbm"),
-                            ludocid=r.get("ludocid"),
-                            kgmid=r.get("kgmid"),
-                            extra_params=extra_params,
-                        )
-                        try:
-                            # Use new namespace API
-                            data = await client.serp.search(req)
-                        except Exception as e:
-                            msg = str(e)
-                            if "Invalid tbm parameter" in msg or "invalid tbm parameter" in msg:
-                                return {
-                                    "index": i,
-                                    "ok": False,
-                                    "q": q,
-                                    "error": {
-                                        "type": "validation_error",
-                                        "message": "Invalid tbm (search type) parameter for SERP.",
-                                        "details": {"tbm": r.get("tbm")},
-                                    },
-                                }
-                            raise
-                    if fmt in {"light_json", "light"}:
+                    for k in _SERP_PASSTHRU_KEYS:
+                        v = r.get(k)
+                        if v is not None:
+                            extra_params[k] = v
+                    req = _build_serp_request(r, query=q, engine=engine, num=num, start=start, output_format=sdk_fmt, extra_params=extra_params, search_type=tbm)
+                    try:
+                        # Use new namespace API
+                        data = await client.serp.search(req)
+                    except Exception as e:
+                        msg = str(e)
+                        if "Invalid tbm parameter" in msg or "invalid tbm parameter" in msg:
+                            return {
+                                "index": i,
+                                "ok": False,
+                                "q": q,
+                                "error": {
+                                    "type": "validation_error",
+                                    "message": "Invalid tbm (search type) parameter for SERP.",
+                                    "details": {"tbm": tbm},
+                                },
+                            }
+                        raise
+                    if fmt in _LIGHT_FMTS:
                         data = _to_light_json(data)
                     return {"index": i, "ok": True, "q": q, "output": data}
                 except Exception as e:
                     return {"index": i, "ok": False, "q": q, "error": str(e)}
 
-            await safe_ctx_info(ctx, f"serp.batch_search count={len(reqs)} concurrency={concurrency} format={fmt}")
-            results = await asyncio.gather(*[_one(i, r if isinstance(r, dict) else {}) for i, r in enumerate(reqs)], return_exceptions=False)
+            await safe_ctx_info(ctx, "serp.batch_search count=%s concurrency=%s format=%s", len(reqs), concurrency, fmt)
+            # A fixed pool of `concurrency` workers bounds parallelism without one pending task per request.
+            results = await map_bounded(_one, reqs, concurrency=concurrency)
             return ok_response(tool="serp", input={"action": "batch_search", "params": p}, output={"results": results})
 
         return error_response(
             tool="serp",
-            input={"action": action, "params": p},
+            input=req_input,
             error_type="validation_error",
             code="E4001",
             message=f"Unknown action '{action}'. Supported actions: 'search', 'batch_search'",
@@ -925,42 +1219,7 @@ def register(mcp: FastMCP) -> None:
                 message="URL parameter is required and cannot be empty",
             )
         
-        # Normalize URL: encode special characters in path and query
-        try:
-            parsed = urlparse(url)
-            # Encode path and query components to handle special characters
-            if parsed.path:
-                # Split path into segments and encode each
-                path_parts = parsed.path.split('/')
-                encoded_path = '/'.join(quote(part, safe='/') for part in path_parts)
-            else:
-                encoded_path = parsed.path
-            
-            if parsed.query:
-                # Encode query string properly
-                query_parts = []
-                for param in parsed.query.split('&'):
-                    if '=' in param:
-                        key, value = param.split('=', 1)
-                        query_parts.append(f"{quote(key, safe='')}={quote(value, safe='')}")
-                    else:
-                        query_parts.append(quote(param, safe=''))
-                encoded_query = '&'.join(query_parts)
-            else:
-                encoded_query = parsed.query
-            
-            # Reconstruct URL with encoded components
-            normalized_url = urlunparse((
-                parsed.scheme,
-                parsed.netloc,
-                encoded_path,
-                parsed.params,
-                encoded_query,
-                parsed.fragment
-            ))
-        except Exception:
-            # If URL parsing fails, use original URL (let SDK handle it)
-            normalized_url = url
+        normalized_url = _normalize_unlocker_url(url)
         
         client = await ServerContext.get_client()
         
@@ -970,76 +1229,30 @@ def register(mcp: FastMCP) -> None:
         # Normalize wait_ms to wait_time
         wait = int(wait_ms) if wait_ms is not None else None
         
-        # Build extra_params for advanced options - only add non-None values
-        extra_params: dict[str, Any] = {}
-        if follow_redirect is not None:
-            extra_params["follow_redirect"] = follow_redirect
-        if clean_content:
-            extra_params["clean_content"] = clean_content
-        if block_resources:
-            extra_params["block_resources"] = block_resources
-        if headers:
-            extra_params["headers"] = headers
-        if cookies:
-            extra_params["cookies"] = cookies
-        
-        # Handle markdown output format
-        fetch_format = "html" if fmt in {"markdown", "md"} else fmt
-        if fmt in {"markdown", "md"}:
-            # Auto-add clean_content for markdown
-            cc = extra_params.get("clean_content", "")
-            if isinstance(cc, str) and cc.strip():
-                parts = [x.strip() for x in cc.split(",") if x.strip()]
-            else:
-                parts = []
-            for x in ("js", "css"):
-                if x not in parts:
-                    parts.append(x)
-            extra_params["clean_content"] = ",".join(parts)
-        
+        is_markdown = fmt in _MARKDOWN_FMTS
+        fetch_format = "html" if is_markdown else fmt
+        scrape_kwargs = _unlocker_scrape_kwargs(
+            {"follow_redirect": follow_redirect, "clean_content": clean_content, "headers": headers, "cookies": cookies},
+            is_markdown=is_markdown,
+            url=normalized_url,
+            js_render=js_render,
+            country=country,
+            wait_for=wait_for,
+            wait_time=wait,
+            output_format=fetch_format,
+            block_resources=block_resources,
+        )
+
         await safe_ctx_info(ctx, f"unlocker url={normalized_url!r} format={fmt} js_render={js_render}")
         
         with PerformanceTimer(tool="unlocker", url=normalized_url):
             try:
                 # Use new namespace API
-                data = await client.universal.scrape_async(
-                    url=normalized_url,
-                    js_render=js_render,
-                    country=country,
-                    wait_for=wait_for,
-                    wait_time=wait,
-                    output_format=fetch_format,
-                    block_resources=block_resources,
-                    **extra_params,
-                )
+                data = await client.universal.scrape_async(**scrape_kwargs)
             except (ThordataNetworkError, ThordataAPIError) as e:
                 # Classify error and provide detailed error message
-                et, ec = _classify_error(e)
-                error_msg = str(e)
-                
-                # Check for HTTP status codes in error message
-                status_code = None
-                if "404" in error_msg or "not found" in error_msg.lower():
-                    status_code = 404
-                    et = "not_found"
-                    ec = "E3003"
-                    error_msg = f"Page not found (404): {normalized_url}"
-                elif "500" in error_msg or "internal server error" in error_msg.lower():
-                    status_code = 500
-                    et = "upstream_internal_error"
-                    ec = "E2106"
-                    error_msg = f"Server error (500): {normalized_url}"
-                elif "403" in error_msg or "forbidden" in error_msg.lower():
-                    status_code = 403
-                    et = "permission_denied"
-                    ec = "E1004"
-                    error_msg = f"Access forbidden (403): {normalized_url}"
-                elif "400" in error_msg or "bad request" in error_msg.lower():
-                    status_code = 400
-                    et = "validation_error"
-                    ec = "E4001"
-                    error_msg = f"Bad request (400): {normalized_url}. This may be due to special characters in the URL."
-                
+                et, ec, error_msg, status_code = _classify_unlocker_error(e, normalized_url)
+
                 # Build input dict efficiently
                 input_dict: dict[str, Any] = {
                     "url": url,  # Use original URL in response
@@ -1065,7 +1278,7 @@ def register(mcp: FastMCP) -> None:
                 )
             except Exception as e:
                 msg = str(e)
-                if "Attempt to decode JSON" in msg or "unexpected mimetype: text/html" in msg:
+                if _is_non_json_upstream_error(msg):
                     return error_response(
                         tool="unlocker",
                         input={"url": url, "js_render": js_render, "output_format": output_format},
@@ -1079,7 +1292,6 @@ def register(mcp: FastMCP) -> None:
         
         # Handle PNG output
         if fetch_format == "png" or isinstance(data, (bytes, bytearray)):
-            import base64
             if isinstance(data, (bytes, bytearray)):
                 if len(data) == 0:
                     # Build input dict efficiently - only include non-None values
@@ -1110,7 +1322,7 @@ def register(mcp: FastMCP) -> None:
                         message="Empty PNG data received. Try enabling js_render=True for JavaScript-rendered pages.",
                         details={"url": url, "output_format": output_format, "js_render": js_render},
                     )
-                png_base64 = base64.b64encode(data).decode("utf-8")
+                png_base64 = encode_png_base64(data)
                 size = len(data)
             else:
                 png_base64 = str(data)
@@ -1134,8 +1346,7 @@ def register(mcp: FastMCP) -> None:
         # Only treat 400+ status codes as errors, 200-299 are success codes
         if not html or html.strip() == "":
             # Check if URL looks like an error endpoint (e.g., httpbin.org/status/404)
-            import re
-            status_match = re.search(r'/status/(\d+)', url.lower())
+            status_match = _STATUS_PATH_RE.search(url.lower())
             if status_match:
                 status_code = int(status_match.group(1))
                 # Only treat 400+ status codes as errors
@@ -1169,10 +1380,8 @@ def register(mcp: FastMCP) -> None:
                     )
                 # For 200-299, empty content is acceptable (success but no content)
         
-        if fmt in {"markdown", "md"}:
-            from thordata_mcp.utils import html_to_markdown_clean, truncate_content
-            md = html_to_markdown_clean(html)
-            md = truncate_content(md, max_length=20_000)
+        if is_markdown:
+            md = html_to_markdown_clean(html, max_chars=20_000)
             
             # Check if markdown is empty after conversion
             if not md or md.strip() == "":
@@ -1271,9 +1480,10 @@ def register(mcp: FastMCP) -> None:
             """Batch web scraping via Universal Scrape."""
             concurrency = max(1, min(int(concurrency), 20))
             client = await ServerContext.get_client()
-            sem = asyncio.Semaphore(concurrency)
 
-            async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
+            async def _one(i: int, r: Any) -> dict[str, Any]:
+                if not isinstance(r, dict):
+                    r = {}
                 url = str(r.get("url", ""))
                 if not url:
                     return {
@@ -1287,37 +1497,7 @@ def register(mcp: FastMCP) -> None:
                         }
                     }
                 
-                # Normalize URL: encode special characters
-                try:
-                    parsed = urlparse(url)
-                    if parsed.path:
-                        path_parts = parsed.path.split('/')
-                        encoded_path = '/'.join(quote(part, safe='/') for part in path_parts)
-                    else:
-                        encoded_path = parsed.path
-                    
-                    if parsed.query:
-                        query_parts = []
-                        for param in parsed.query.split('&'):
-                            if '=' in param:
-                                key, value = param.split('=', 1)
-                                query_parts.append(f"{quote(key, safe='')}={quote(value, safe='')}")
-                            else:
-                                query_parts.append(quote(param, safe=''))
-                        encoded_query = '&'.join(query_parts)
-                    else:
-                        encoded_query = parsed.query
-                    
-                    normalized_url = urlunparse((
-                        parsed.scheme,
-                        parsed.netloc,
-                        encoded_path,
-                        parsed.params,
-                        encoded_query,
-                        parsed.fragment
-                    ))
-                except Exception:
-                    normalized_url = url
+                normalized_url = _normalize_unlocker_url(url)
                 
                 output_format = str(r.get("output_format", "html"))
                 js_render = bool(r.get("js_render", True))
@@ -1327,80 +1507,49 @@ def register(mcp: FastMCP) -> None:
                 wait_for = r.get("wait_for")
                 max_chars = int(r.get("max_chars", 20_000))
                 wait = int(wait_ms) if isinstance(wait_ms, (int, float)) else None
-                extra_params = r.get("extra_params") or {}
-                if not isinstance(extra_params, dict):
-                    extra_params = {}
                 fmt = (output_format or "html").strip().lower()
-                fetch_format = "html" if fmt in {"markdown", "md"} else fmt
-
-                # Handle extra parameters
-                if r.get("follow_redirect") is not None:
-                    extra_params["follow_redirect"] = r.get("follow_redirect")
-                if r.get("clean_content"):
-                    extra_params["clean_content"] = r.get("clean_content")
-                if r.get("headers"):
-                    extra_params["headers"] = r.get("headers")
-                if r.get("cookies"):
-                    extra_params["cookies"] = r.get("cookies")
-                if block_resources:
-                    extra_params["block_resources"] = block_resources
-
-                async with sem:
-                    try:
-                        data = await client.universal.scrape_async(
-                            url=normalized_url,
-                            js_render=js_render,
-                            country=country,
-                            wait_for=wait_for,
-                            wait_time=wait,
-                            output_format=fetch_format,
-                            block_resources=block_resources,
-                            **extra_params,
-                        )
-                    except (ThordataNetworkError, ThordataAPIError) as e:
-                        et, ec = _classify_error(e)
-                        error_msg = str(e)
-                        
-                        # Check for HTTP status codes
-                        status_code = None
-                        if "404" in error_msg or "not found" in error_msg.lower():
-                            status_code = 404
-                            et = "not_found"
-                            ec = "E3003"
-                            error_msg = f"Page not found (404): {normalized_url}"
-                        elif "500" in error_msg or "internal server error" in error_msg.lower():
-                            status_code = 500
-                            et = "upstream_internal_error"
-                            ec = "E2106"
-                            error_msg = f"Server error (500): {normalized_url}"
-                        elif "403" in error_msg or "forbidden" in error_msg.lower():
-                            status_code = 403
-                            et = "permission_denied"
-                            ec = "E1004"
-                            error_msg = f"Access forbidden (403): {normalized_url}"
-                        elif "400" in error_msg or "bad request" in error_msg.lower():
-                            status_code = 400
-                            et = "validation_error"
-                            ec = "E4001"
-                            error_msg = f"Bad request (400): {normalized_url}"
-                        
-                        return {
-                            "index": i,
-                            "ok": False,
-                            "url": url,  # Return original URL
-                            "error": {
-                                "type": et,
-                                "code": ec,
-                                "message": error_msg,
-                                "status_code": status_code,
-                                "normalized_url": normalized_url,
-                            }
+                is_markdown = fmt in _MARKDOWN_FMTS
+                fetch_format = "html" if is_markdown else fmt
+                try:
+                    scrape_kwargs = _unlocker_scrape_kwargs(
+                        r,
+                        is_markdown=is_markdown,
+                        url=normalized_url,
+                        js_render=js_render,
+                        country=country,
+                        wait_for=wait_for,
+                        wait_time=wait,
+                        output_format=fetch_format,
+                        block_resources=block_resources,
+                    )
+                except ValueError as e:
+                    return {
+                        "index": i,
+                        "ok": False,
+                        "url": url,
+                        "error": {"type": "validation_error", "code": "E4001", "message": str(e)},
+                    }
+
+                try:
+                    data = await client.universal.scrape_async(**scrape_kwargs)
+                except (ThordataNetworkError, ThordataAPIError) as e:
+                    et, ec, error_msg, status_code = _classify_unlocker_error(e, normalized_url)
+                    return {
+                        "index": i,
+                        "ok": False,
+                        "url": url,  # Return original URL
+                        "error": {
+                            "type": et,
+                            "code": ec,
+                            "message": error_msg,
+                            "status_code": status_code,
+                            "normalized_url": normalized_url,
                         }
+                    }
 
                 if fetch_format == "png":
-                    import base64
                     if isinstance(data, (bytes, bytearray)):
-                        png_base64 = base64.b64encode(data).decode("utf-8")
+                        png_base64 = encode_png_base64(data)
                         size = len(data)
                     else:
                         png_base64 = str(data)
@@ -1412,8 +1561,7 @@ def register(mcp: FastMCP) -> None:
                 # Check for empty content (might indicate HTTP 404/500)
                 # Only treat 400+ status codes as errors
                 if not html or html.strip() == "":
-                    import re
-                    status_match = re.search(r'/status/(\d+)', url.lower())
+                    status_match = _STATUS_PATH_RE.search(url.lower())
                     if status_match:
                         status_code = int(status_match.group(1))
                         # Only treat 400+ status codes as errors
@@ -1433,16 +1581,14 @@ def register(mcp: FastMCP) -> None:
                                 }
                             }
                 
-                if fmt in {"markdown", "md"}:
-                    from thordata_mcp.utils import html_to_markdown_clean, truncate_content
-                    md = html_to_markdown_clean(html)
-                    md = truncate_content(md, max_length=max_chars)
+                if is_markdown:
+                    md = html_to_markdown_clean(html, max_chars=max_chars)
                     return {"index": i, "ok": True, "url": url, "output": {"markdown": md}}
 
                 return {"index": i, "ok": True, "url": url, "output": {"html": html}}
 
-            await safe_ctx_info(ctx, f"unlocker_batch count={len(requests)} concurrency={concurrency}")
-            results = await asyncio.gather(*[_one(i, r) for i, r in enumerate(requests)])
+            await safe_ctx_info(ctx, "unlocker_batch count=%s concurrency=%s", len(requests), concurrency)
+            results = await map_bounded(_one, requests, concurrency=concurrency)
             return ok_response(
                 tool="unlocker_batch",
                 input={"count": len(requests), "concurrency": concurrency},
@@ -1494,16 +1640,14 @@ def register(mcp: FastMCP) -> None:
             try:
                 p = normalize_params(params, "web_scraper", action)
             except ValueError as e:
-                if "JSON" in str(e):
-                    return create_params_error("web_scraper", action, params, str(e))
-                else:
-                    return create_params_error("web_scraper", action, params, str(e))
+                return create_params_error("web_scraper", action, params, str(e))
+            req_input = {"action": action, "params": p}
             
             a = (action or "").strip().lower()
             if not a:
                 return error_response(
                     tool="web_scraper",
-                    input={"action": action, "params": p},
+                    input=req_input,
                     error_type="validation_error",
                     code="E4001",
                     message="action is required",
@@ -1539,9 +1683,8 @@ def register(mcp: FastMCP) -> None:
                 # Tool discovery is configurable to reduce LLM tool selection noise.
                 # - mode=curated: only allow groups from THORDATA_TASKS_GROUPS
                 # - mode=all: list everything
-                cfg = get_settings()
-                mode = str(getattr(cfg, "THORDATA_TASKS_LIST_MODE", "curated") or "curated").strip().lower()
-                groups_allow = [g.strip().lower() for g in (getattr(cfg, "THORDATA_TASKS_GROUPS", "") or "").split(",") if g.strip()]
+                mode = catalog_mode
+                groups_allow = catalog_groups
 
                 # Respect explicit group filter provided by user
                 group_in = p.get("group")
@@ -1569,8 +1712,7 @@ def register(mcp: FastMCP) -> None:
                         },
                     )
 
-                limit_default = int(getattr(cfg, "THORDATA_TASKS_LIST_DEFAULT_LIMIT", 60) or 60)
-                limit = max(1, min(int(p.get("limit", limit_default)), 500))
+                limit = max(1, min(int(p.get("limit", catalog_limit_default)), 500))
                 offset = max(0, int(p.get("offset", 0)))
                 page, meta = _catalog(group=group, keyword=p.get("keyword"), limit=limit, offset=offset)
 
@@ -1584,19 +1726,21 @@ def register(mcp: FastMCP) -> None:
                     }
                 )
 
+                # p may be the caller's dict, so stamp the effective group on a copy,
+                # and only when it differs from what was passed in.
+                params_echo = {**p, "group": group} if group and p.get("group") != group else p
                 return ok_response(
                     tool="web_scraper",
-                    input={"action": "catalog", "params": {**p, "group": group} if group else p},
+                    input={"action": "catalog", "params": params_echo},
                     output={"tools": [tool_schema(t) for t in page], "meta": meta},
                 )
 
-            if a in {"example", "template"}:
+            if a in ("example", "template"):
                 tool = str(p.get("tool", "")) or str(p.get("tool_key", ""))
                 if not tool:
                     return error_response(tool="web_scraper", input={"action": a, "params": p}, error_type="validation_error", code="E4001", message="Missing tool (tool_key)")
                 # Ensure tool exists and produce its schema + minimal params template.
-                from .product import _ensure_tools as _ensure  # local import to avoid cycles
-                _, tools_map = _ensure()
+                _, tools_map = _ensure_tools()
                 t = tools_map.get(tool)
                 if not t:
                     return error_response(tool="web_scraper", input={"action": a, "params": p}, error_type="invalid_tool", code="E4003", message="Unknown tool key. Use web_scraper.catalog to discover valid keys.")
@@ -1633,7 +1777,7 @@ def register(mcp: FastMCP) -> None:
                     },
                 )
 
-            if a in {"raw_run", "raw_batch_run"}:
+            if a in ("raw_run", "raw_batch_run"):
                 # Ultimate fallback for 100% Dashboard parity: run by spider_id/spider_name directly,
                 # even if SDK doesn't provide a ToolRequest class for it.
 
@@ -1655,65 +1799,52 @@ def register(mcp: FastMCP) -> None:
                     sp = raw.get("spider_parameters", raw.get("parameters"))
                     if isinstance(sp, str):
                         try:
-                            sp = json.loads(sp) if sp else {}
+                            sp = loads_json(sp) if sp else {}
                         except Exception:
                             sp = {"raw": sp}
+                    # A single object is sent as-is, several as a list
+                    parameters: dict[str, Any] | list[dict[str, Any]] = {}
                     if isinstance(sp, dict):
-                        sp_list: list[dict[str, Any]] = [sp]
+                        parameters = sp
                     elif isinstance(sp, list):
-                        sp_list = [x for x in sp if isinstance(x, dict)]
-                        if not sp_list:
-                            sp_list = [{}]
-                    else:
-                        sp_list = [{}]
+                        # Well-formed lists (the common case) are passed through without copying
+                        sp_list = sp if all(type(x) is dict for x in sp) else [x for x in sp if isinstance(x, dict)]
+                        if len(sp_list) == 1:
+                            parameters = sp_list[0]
+                        elif sp_list:
+                            parameters = sp_list
 
                     # spider_universal: for builder universal params or video common_settings
                     su = raw.get("spider_universal") or raw.get("universal_params") or raw.get("common_settings")
                     if isinstance(su, str):
                         try:
-                            su = json.loads(su) if su else None
+                            su = loads_json(su) if su else None
                         except Exception:
                             su = None
                     su_dict = su if isinstance(su, dict) else None
 
-                    # Lazy import types from SDK
-                    from thordata.types.task import ScraperTaskConfig, VideoTaskConfig
-                    from thordata.types.common import CommonSettings
-
                     # Generate file_name if missing (mirror SDK behavior)
                     if not file_name:
-                        import uuid
-                        short_id = uuid.uuid4().hex[:8]
-                        file_name = f"{spider_id}_{short_id}"
+                        file_name = f"{spider_id}_{token_hex(4)}"
 
                     await safe_ctx_info(ctx, f"web_scraper.{a} spider_id={spider_id} builder={builder} wait={wait}")
 
                     # Create task via correct builder endpoint
-                    if builder in {"video_builder", "video"}:
+                    if builder in ("video_builder", "video"):
                         # Defensive filtering: CommonSettings in the SDK may not include every
                         # key shown in external documentation (e.g. some newer fields like
                         # "kilohertz" / "bitrate" may not yet exist in this SDK version).
                         # Passing unknown keys would raise "unexpected keyword argument" errors,
                         # so we restrict to the dataclass' declared fields.
-                        cs_input: dict[str, Any] = {}
-                        if su_dict:
-                            allowed_keys = getattr(CommonSettings, "__dataclass_fields__", {}).keys()
-                            cs_input = {k: v for k, v in su_dict.items() if k in allowed_keys}
-                        cs = CommonSettings(**cs_input)
-                        config = VideoTaskConfig(
-                            file_name=str(file_name),
-                            spider_id=spider_id,
-                            spider_name=spider_name,
-                            parameters=sp_list if len(sp_list) > 1 else sp_list[0],
-                            common_settings=cs,
-                            include_errors=include_errors,
-                        )
+                        cs_input = {k: v for k, v in su_dict.items() if k in _CS_FIELDS} if su_dict else None
+                        # A fresh (mutable) instance per task; never shared across requests.
+                        cs = CommonSettings(**(cs_input or {}))
                         # Use new namespace API
                         task_id = await client.scraper.create_task_async(
                             file_name=str(file_name),
                             spider_id=spider_id,
                             spider_name=spider_name,
-                            parameters=sp_list if len(sp_list) > 1 else sp_list[0],
+                            parameters=parameters,
                             common_settings=cs,
                             include_errors=include_errors,
                             data_format=data_format,  # Support json/csv/xlsx output formats
@@ -1724,7 +1855,7 @@ def register(mcp: FastMCP) -> None:
                             file_name=str(file_name),
                             spider_id=spider_id,
                             spider_name=spider_name,
-                            parameters=sp_list if len(sp_list) > 1 else sp_list[0],
+                            parameters=parameters,
                             common_settings=su_dict,  # universal_params mapped to common_settings
                             include_errors=include_errors,
                             data_format=data_format,  # Support json/csv/xlsx output formats
@@ -1735,9 +1866,8 @@ def register(mcp: FastMCP) -> None:
                         status = await client.wait_for_task(task_id, max_wait=max_wait_seconds)
                         status_s = str(status)
                         result["status"] = status_s
-                        if status_s.strip().lower() in {"ready", "success", "finished", "succeeded", "task succeeded", "task_succeeded"}:
+                        if status_s.strip().lower() in TASK_SUCCESS_STATUSES:
                             dl = await client.get_task_result(task_id, file_type=file_type)
-                            from thordata_mcp.utils import enrich_download_url
                             result["download_url"] = enrich_download_url(dl, task_id=task_id, file_type=file_type)
                     return {"ok": True, "output": result}
 
@@ -1751,15 +1881,13 @@ def register(mcp: FastMCP) -> None:
                 if not isinstance(reqs, list) or not reqs:
                     return error_response(tool="web_scraper", input={"action": a, "params": p}, error_type="validation_error", code="E4001", message="Missing requests[]")
                 concurrency = max(1, min(int(p.get("concurrency", 5)), 20))
-                sem = asyncio.Semaphore(concurrency)
+                # Non-dict items fall through to _one's "missing spider" validation error.
+                reqs = [r if isinstance(r, dict) else {} for r in reqs]
 
-                async def _wrap(i: int, r: Any) -> dict[str, Any]:
-                    raw = r if isinstance(r, dict) else {}
-                    async with sem:
-                        one = await _one(raw)
-                    return {"index": i, **one}
+                async def _wrap(i: int, r: dict[str, Any]) -> dict[str, Any]:
+                    return {"index": i, **await _one(r)}
 
-                results = await asyncio.gather(*[_wrap(i, r) for i, r in enumerate(reqs)], return_exceptions=False)
+                results = await map_bounded(_wrap, reqs, concurrency=concurrency)
                 return ok_response(tool="web_scraper", input={"action": a, "params": {"count": len(reqs), "concurrency": concurrency}}, output={"results": results})
 
             if a == "run":
@@ -1767,7 +1895,7 @@ def register(mcp: FastMCP) -> None:
                 if not tool:
                     return error_response(
                         tool="web_scraper",
-                        input={"action": action, "params": p},
+                        input=req_input,
                         error_type="validation_error",
                         code="E4001",
                         message="Missing tool",
@@ -1781,56 +1909,41 @@ def register(mcp: FastMCP) -> None:
                 if params_dict is None:
                     if isinstance(param_json, str) and param_json:
                         try:
-                            params_dict = json.loads(param_json)
-                        except json.JSONDecodeError as e:
+                            params_dict = loads_json(param_json)
+                        except ValueError as e:
                             return error_response(
                                 tool="web_scraper",
-                                input={"action": action, "params": p},
+                                input=req_input,
                                 error_type="json_error",
                                 code="E4002",
                                 message=str(e),
                             )
                     else:
                         params_dict = {}
-                wait = bool(p.get("wait", True))
 
                 # Validate required fields based on tool schema
-                from .product import _ensure_tools as _ensure
-                _, tools_map = _ensure()
-                t = tools_map.get(tool)
-                if not t:
+                required_fields = _required_fields(tool)
+                if required_fields is None:
                     return error_response(
                         tool="web_scraper",
-                        input={"action": action, "params": p},
+                        input=req_input,
                         error_type="invalid_tool",
                         code="E4003",
                         message="Unknown tool key. Use web_scraper.catalog to discover valid keys.",
                     )
-                schema = tool_schema(t)
-                fields = schema.get("fields", {})
-                missing_fields = []
-                params_template = {}
-                for key, meta in fields.items():
-                    required = bool(meta.get("required"))
-                    if required and (params_dict is None or key not in params_dict or params_dict.get(key) in (None, "", [])):
-                        missing_fields.append(key)
-                    # Build minimal template for missing fields
-                    if required and key not in (params_dict or {}):
-                        default = meta.get("default")
-                        typ = str(meta.get("type", "")).lower()
-                        if "dict" in typ:
-                            params_template[key] = {}
-                        elif "list" in typ:
-                            params_template[key] = []
-                        elif default is not None:
-                            params_template[key] = default
-                        else:
-                            params_template[key] = f"<{key}>"
+                supplied = params_dict or {}
+                missing_fields = [
+                    key for key, _ in required_fields if key not in supplied or supplied[key] in (None, "", [])
+                ]
 
                 if missing_fields:
+                    # Build minimal template for the fields that were not supplied at all
+                    params_template = {
+                        key: _field_placeholder(placeholder) for key, placeholder in required_fields if key not in supplied
+                    }
                     return error_response(
                         tool="web_scraper",
-                        input={"action": action, "params": p},
+                        input=req_input,
                         error_type="validation_error",
                         code="E4001",
                         message="Missing required fields for tool params",
@@ -1841,18 +1954,14 @@ def register(mcp: FastMCP) -> None:
                             "tip": f"Run web_scraper(action='example', params={{'tool': '{tool}'}}) to see full template",
                         },
                     )
-                wait = bool(p.get("wait", True))
 
                 # Execution-layer allowlist (optional safety)
                 allowlist = getattr(settings, "THORDATA_TASKS_ALLOWLIST", "")
                 if allowlist and allowlist.strip():
-                    allowed_prefixes = [prefix.strip().lower() for prefix in allowlist.split(",") if prefix.strip()]
-                    allowed_exact = [exact.strip() for exact in allowlist.split(",") if exact.strip()]
-                    tool_lower = tool.lower()
-                    if not any(tool_lower.startswith(p) for p in allowed_prefixes) and tool_lower not in allowed_exact:
+                    if not matches_any_prefix_or_exact(tool.lower(), _parse_allowlist(allowlist)):
                         return error_response(
                             tool="web_scraper",
-                            input={"action": action, "params": p},
+                            input=req_input,
                             error_type="not_allowed",
                             code="E4011",
                             message="Tool not allowed by allowlist.",
@@ -1870,28 +1979,27 @@ def register(mcp: FastMCP) -> None:
             if a == "batch_run":
                 reqs = p.get("requests")
                 if not isinstance(reqs, list) or not reqs:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing requests[]")
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing requests[]")
                 concurrency = max(1, min(int(p.get("concurrency", 5)), 20))
                 wait = bool(p.get("wait", True))
                 max_wait_seconds = int(p.get("max_wait_seconds", 300))
                 file_type = str(p.get("file_type", "json"))
-                sem = asyncio.Semaphore(concurrency)
+                reqs = [r if isinstance(r, dict) else {} for r in reqs]
 
                 async def _one(i: int, r: dict[str, Any]) -> dict[str, Any]:
                     tool = str(r.get("tool", ""))
                     if not tool:
                         return {"index": i, "ok": False, "error": {"type": "validation_error", "message": "Missing tool"}}
                     params_dict = r.get("params") if isinstance(r.get("params"), dict) else {}
-                    async with sem:
-                        out = await _run_web_scraper_tool(tool=tool, params=params_dict, wait=wait, max_wait_seconds=max_wait_seconds, file_type=file_type, ctx=ctx)
+                    out = await _run_web_scraper_tool(tool=tool, params=params_dict, wait=wait, max_wait_seconds=max_wait_seconds, file_type=file_type, ctx=ctx)
                     # compact per-item
                     if out.get("ok") is True and isinstance(out.get("output"), dict):
                         o = out["output"]
                         out["output"] = {k: o.get(k) for k in ("task_id", "spider_id", "spider_name", "status", "download_url") if k in o}
                     return {"index": i, **out}
 
-                await safe_ctx_info(ctx, f"web_scraper.batch_run count={len(reqs)} concurrency={concurrency}")
-                results = await asyncio.gather(*[_one(i, r if isinstance(r, dict) else {}) for i, r in enumerate(reqs)])
+                await safe_ctx_info(ctx, "web_scraper.batch_run count=%s concurrency=%s", len(reqs), concurrency)
+                results = await map_bounded(_one, reqs, concurrency=concurrency)
                 return ok_response(tool="web_scraper", input={"action": "batch_run", "params": p}, output={"results": results})
 
             if a == "list_tasks":
@@ -1903,27 +2011,31 @@ def register(mcp: FastMCP) -> None:
             if a == "status":
                 tid = str(p.get("task_id", ""))
                 if not tid:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing task_id")
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing task_id")
                 s = await client.get_task_status(tid)
                 return ok_response(tool="web_scraper", input={"action": "status", "params": p}, output={"task_id": tid, "status": str(s)})
 
             if a == "status_batch":
                 tids = p.get("task_ids")
                 if not isinstance(tids, list) or not tids:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing task_ids[]")
-                results = []
-                for tid in [str(x) for x in tids[:200]]:
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing task_ids[]")
+
+                async def _status_one(_i: int, tid: str) -> dict[str, Any]:
                     try:
                         s = await client.get_task_status(tid)
-                        results.append({"task_id": tid, "ok": True, "status": str(s)})
+                        return {"task_id": tid, "ok": True, "status": str(s)}
                     except Exception as e:
-                        results.append({"task_id": tid, "ok": False, "error": {"message": str(e)}})
+                        return {"task_id": tid, "ok": False, "error": {"message": str(e)}}
+
+                results = await map_bounded(
+                    _status_one, [str(x) for x in tids[:200]], concurrency=_TASK_LOOKUP_CONCURRENCY
+                )
                 return ok_response(tool="web_scraper", input={"action": "status_batch", "params": {"count": len(tids)}}, output={"results": results})
 
             if a == "wait":
                 tid = str(p.get("task_id", ""))
                 if not tid:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing task_id")
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing task_id")
                 poll = float(p.get("poll_interval_seconds", 5.0))
                 max_wait = float(p.get("max_wait_seconds", 600.0))
                 s = await client.wait_for_task(tid, poll_interval=poll, max_wait=max_wait)
@@ -1932,12 +2044,14 @@ def register(mcp: FastMCP) -> None:
             if a == "result":
                 tid = str(p.get("task_id", ""))
                 if not tid:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing task_id")
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing task_id")
                 file_type = str(p.get("file_type", "json"))
                 preview = bool(p.get("preview", True))
-                preview_max_chars = int(p.get("preview_max_chars", 20_000))
+                try:
+                    preview_max_chars = _preview_max_chars(p)
+                except ValueError as e:
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message=str(e))
                 dl = await client.get_task_result(tid, file_type=file_type)
-                from thordata_mcp.utils import enrich_download_url
 
                 dl = enrich_download_url(dl, task_id=tid, file_type=file_type)
                 preview_obj = None
@@ -1955,14 +2069,16 @@ def register(mcp: FastMCP) -> None:
             if a == "result_batch":
                 tids = p.get("task_ids")
                 if not isinstance(tids, list) or not tids:
-                    return error_response(tool="web_scraper", input={"action": action, "params": p}, error_type="validation_error", code="E4001", message="Missing task_ids[]")
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message="Missing task_ids[]")
                 file_type = str(p.get("file_type", "json"))
                 preview = bool(p.get("preview", False))
-                preview_max_chars = int(p.get("preview_max_chars", 20_000))
-                from thordata_mcp.utils import enrich_download_url
+                try:
+                    preview_max_chars = _preview_max_chars(p)
+                except ValueError as e:
+                    return error_response(tool="web_scraper", input=req_input, error_type="validation_error", code="E4001", message=str(e))
+
 
-                results = []
-                for tid in [str(x) for x in tids[:100]]:
+                async def _result_one(_i: int, tid: str) -> dict[str, Any]:
                     try:
                         dl = await client.get_task_result(tid, file_type=file_type)
                         dl = enrich_download_url(dl, task_id=tid, file_type=file_type)
@@ -1976,9 +2092,13 @@ def register(mcp: FastMCP) -> None:
                                     structured = _normalize_record(data[0])
                                 elif isinstance(data, dict):
                                     structured = _normalize_record(data)
-                        results.append({"task_id": tid, "ok": True, "download_url": dl, "preview": prev, "structured": structured})
+                        return {"task_id": tid, "ok": True, "download_url": dl, "preview": prev, "structured": structured}
                     except Exception as e:
-                        results.append({"task_id": tid, "ok": False, "error": {"message": str(e)}})
+                        return {"task_id": tid, "ok": False, "error": {"message": str(e)}}
+
+                results = await map_bounded(
+                    _result_one, [str(x) for x in tids[:100]], concurrency=_TASK_LOOKUP_CONCURRENCY
+                )
                 return ok_response(tool="web_scraper", input={"action": "result_batch", "params": {"count": len(tids)}}, output={"results": results})
 
             if a == "cancel":
@@ -1988,7 +2108,7 @@ def register(mcp: FastMCP) -> None:
 
             return error_response(
             tool="web_scraper",
-            input={"action": action, "params": p},
+            input=req_input,
             error_type="validation_error",
             code="E4001",
             message=(
@@ -2235,6 +2355,8 @@ def register(mcp: FastMCP) -> None:
             "- preview_max_chars (default: 20000): Maximum characters in preview (1-100000)\n"
             "- max_wait_seconds (default: 300): Maximum wait time for task completion\n"
             "- unlocker_output (default: 'markdown'): Output format when using Unlocker fallback\n"
+            "- race_candidates (default: False): Run the top two Web Scraper candidates concurrently and keep the first success, then try the third if both fail (both upstream tasks are started and billed)\n"
+            "- use_failure_cache (default: True): Skip Web Scraper tools whose upstream task failed for this host in the last 5 minutes\n"
             "\n"
             "Examples:\n"
             "- smart_scrape(url='https://amazon.com/dp/B08N5WRWNW')  # Auto-detects Amazon product tool\n"
@@ -2259,6 +2381,8 @@ def register(mcp: FastMCP) -> None:
         preview_max_chars: int = 20_000,
         max_wait_seconds: int = 300,
         unlocker_output: str = "markdown",
+        race_candidates: bool = False,
+        use_failure_cache: bool = True,
         ctx: Optional[Context] = None,
     ) -> dict[str, Any]:
         """Auto-pick a Web Scraper task for URL; fallback to Unlocker. Always returns structured."""
@@ -2281,6 +2405,7 @@ def register(mcp: FastMCP) -> None:
                 message="max_wait_seconds must be between 1 and 600",
                 details={"max_wait_seconds": max_wait_seconds},
             )
+        pmax = int(preview_max_chars)
         await safe_ctx_info(ctx, f"smart_scrape url={url!r} prefer_structured={prefer_structured}")
         host = _hostname(url)
         url_lower = url.lower()
@@ -2288,34 +2413,14 @@ def register(mcp: FastMCP) -> None:
 
         # Special-case: Google search pages are best handled by SERP (more reliable than Unlocker).
         if prefer_structured:
-            def _is_google_search_local(u: str) -> tuple[bool, str | None]:
-                try:
-                    from urllib.parse import urlparse, parse_qs
-
-                    p0 = urlparse(u)
-                    h0 = (p0.hostname or "").lower()
-                    if h0.startswith("www."):
-                        h0 = h0[4:]
-                    if h0 != "google.com":
-                        return (False, None)
-                    if p0.path != "/search":
-                        return (False, None)
-                    qs0 = parse_qs(p0.query or "")
-                    q0 = (qs0.get("q") or [""])[0].strip()
-                    return (bool(q0), q0 or None)
-                except Exception:
-                    return (False, None)
-
-            is_g, q = _is_google_search_local(url)
+            is_g, q = _google_search_query(url)
             if is_g:
                 await safe_ctx_info(ctx, f"smart_scrape: Google search detected, routing to SERP q={q!r}")
                 try:
-                    from thordata.types import SerpRequest
-                    from thordata.types import Engine as EngineEnum
                     client = await ServerContext.get_client()
                     req = SerpRequest(
                         query=str(q or ""),
-                        engine=EngineEnum.GOOGLE,
+                        engine=Engine.GOOGLE,
                         num=10,
                         start=0,
                         country=None,
@@ -2327,7 +2432,7 @@ def register(mcp: FastMCP) -> None:
                     data = await client.serp_search_advanced(req)
                     serp_preview = None
                     if preview:
-                        raw = truncate_content(str(data), max_length=int(preview_max_chars))
+                        raw = truncate_json(data, max_length=pmax)
                         serp_preview = {"format": "light_json", "raw": raw}
                     # Build input dict efficiently - only include non-None values
                     input_dict: dict[str, Any] = {
@@ -2368,35 +2473,31 @@ def register(mcp: FastMCP) -> None:
         skip_web_scraper = False
         if host == "google.com" and "/search" in url_lower:
             skip_web_scraper = True
-        generic_domains = {"example.com", "example.org", "example.net", "test.com", "localhost"}
-        if host in generic_domains or (host and host.endswith(".example.com")):
+        if host in _GENERIC_DOMAINS or (host and host.endswith(".example.com")):
             skip_web_scraper = True
 
         selected_tool: str | None = None
         selected_params: dict[str, Any] = {}
         candidates: list[tuple[str, dict[str, Any]]] = []
+        candidate_names: list[str] = []
         if not skip_web_scraper:
             selected_tool, selected_params = _guess_tool_for_url(url)
             # Only keep guessed tool if it exists in tool map (avoid invalid hardcode drift)
-            from .product import _ensure_tools as _ensure  # local import to avoid cycles
-
-            _, tools_map = _ensure()
+            _, tools_map = _ensure_tools()
             if selected_tool and selected_tool in tools_map:
                 candidates.append((selected_tool, selected_params))
+                candidate_names.append(selected_tool)
 
             if not candidates:
                 candidate_keys = _candidate_tools_for_url(url, limit=3)
-                # Filter out obviously wrong tools (like GitHub for non-GitHub URLs)
+                # Filter out obviously wrong tools (like GitHub for non-GitHub URLs);
+                # host is already lower-cased by _hostname.
                 filtered_candidates: list[str] = []
                 for k in candidate_keys:
                     lk = k.lower()
-                    if "github" in lk and host and "github" not in host.lower():
-                        continue
-                    if "repository" in lk and host and "github" not in host.lower() and "gitlab" not in host.lower():
-                        continue
-                    if "amazon" in lk and host and "amazon" not in host.lower():
-                        continue
-                    if "walmart" in lk and host and "walmart" not in host.lower():
+                    if host and any(
+                        token in lk and not any(name in host for name in names) for token, names in _TOOL_HOST_REQ
+                    ):
                         continue
                     if ("googleshopping" in lk or "google.shopping" in lk) and (host == "google.com" or "/search" in url_lower):
                         continue
@@ -2404,75 +2505,118 @@ def register(mcp: FastMCP) -> None:
 
                 for k in filtered_candidates:
                     candidates.append((k, {"url": url}))
+                    candidate_names.append(k)
         else:
             await safe_ctx_info(ctx, f"smart_scrape: skipping Web Scraper for host={host!r} url={url!r}")
 
-        if prefer_structured and candidates:
-            for tool, params in candidates[:3]:
-                r = await _run_web_scraper_tool(tool=tool, params=params, wait=True, max_wait_seconds=max_wait_seconds, file_type="json", ctx=ctx)
-                # Check if task succeeded (status should be Ready/Success, not Failed)
-                result_obj = r.get("output") if isinstance(r.get("output"), dict) else {}
-                status = result_obj.get("status", "").lower() if isinstance(result_obj, dict) else ""
-                
-                # If status is Failed, don't try more Web Scraper tools - go to Unlocker
-                # Also check if r.get("ok") is False, which indicates the tool call itself failed
-                if status == "failed" or r.get("ok") is False:
-                    error_info = r.get("error") if isinstance(r.get("error"), dict) else {}
-                    error_msg = error_info.get("message") if isinstance(error_info, dict) else str(r.get("error", ""))
-                    await safe_ctx_info(ctx, f"smart_scrape: Web Scraper tool {tool} failed (status={status}, ok={r.get('ok')}, error={error_msg}), falling back to Unlocker")
+        def _record_failure(tool: str, r: dict[str, Any], status: str) -> str:
+            """Note a failed Web Scraper attempt in `tried`; return its message.
+
+            Only a definitive upstream task failure goes into the failure cache.
+            """
+            error_info = r.get("error") if isinstance(r.get("error"), dict) else {}
+            error_msg = error_info.get("message") if isinstance(error_info, dict) else str(r.get("error", ""))
+            if status == "failed":
+                _mark_failed(tool, host)
+            tried.append({
+                "tool": tool,
+                "ok": r.get("ok"),
+                "status": status,
+                "error": error_msg if error_msg else r.get("error"),
+                "details": error_info if isinstance(error_info, dict) else None,
+            })
+            return error_msg
+
+        async def _attempt(tool: str, params: dict[str, Any]) -> tuple[str, dict[str, Any], dict[str, Any]]:
+            r = await _run_web_scraper_tool(tool=tool, params=params, wait=True, max_wait_seconds=max_wait_seconds, file_type="json", ctx=ctx)
+            return tool, params, r
+
+        def _note_abandoned(tasks: list[asyncio.Task[Any]], names: list[str]) -> None:
+            """Cancel unfinished race tasks and list them in `tried`; upstream jobs keep running."""
+            for task, name in zip(tasks, names):
+                if not task.done():
+                    task.cancel()
                     tried.append({
-                        "tool": tool,
-                        "ok": r.get("ok"),
-                        "status": status,
-                        "error": error_msg if error_msg else r.get("error"),
-                        "details": error_info if isinstance(error_info, dict) else None,
+                        "tool": name,
+                        "ok": None,
+                        "status": "abandoned",
+                        "error": "Lost the candidate race; the upstream task may still run and be billed.",
                     })
-                    break  # Exit loop and go to Unlocker fallback
+
+        if prefer_structured and candidates:
+            runnable: list[tuple[str, dict[str, Any]]] = []
+            for tool, params in candidates:
+                if use_failure_cache and _recently_failed(tool, host):
+                    tried.append({"tool": tool, "ok": False, "status": "skipped", "error": "Failed recently for this host; not retried."})
+                else:
+                    runnable.append((tool, params))
+            # Without racing the first failure goes straight to Unlocker, so at most one
+            # upstream job is started. Racing overlaps the top two candidates and, if both
+            # fail, tries the third; the generators are lazy, so it starts only then.
+            plan = runnable[:3]
+            race_tasks: list[asyncio.Task[tuple[str, dict[str, Any], dict[str, Any]]]] = []
+            attempts: Iterable[Awaitable[tuple[str, dict[str, Any], dict[str, Any]]]]
+            if race_candidates and len(plan) > 1:
+                # Speculatively run the top two candidates; the first usable result wins.
+                race_tasks = [asyncio.create_task(_attempt(t, p)) for t, p in plan[:2]]
+                attempts = chain(asyncio.as_completed(race_tasks), (_attempt(t, p) for t, p in plan[2:]))
+            else:
+                attempts = (_attempt(t, p) for t, p in plan)
+            try:
+                for next_attempt in attempts:
+                    tool, params, r = await next_attempt
+                    # Check if task succeeded (status should be Ready/Success, not Failed)
+                    result_obj = r.get("output") if isinstance(r.get("output"), dict) else {}
+                    status = result_obj.get("status", "").lower() if isinstance(result_obj, dict) else ""
                 
-                # Only return success if both ok is True AND status is not failed
-                if r.get("ok") is True and status not in {"failed", "error", "failure"}:
-                    out = r.get("output") if isinstance(r.get("output"), dict) else {}
-                    dl = out.get("download_url") if isinstance(out, dict) else None
-                    preview_obj = None
-                    structured = {"url": url}
-                    if preview and isinstance(dl, str) and dl:
-                        preview_obj = await _fetch_json_preview(dl, max_chars=int(preview_max_chars))
-                        # Try to use preview data even if JSON parsing failed but we have raw data
-                        if preview_obj.get("ok") is True:
-                            data = preview_obj.get("data")
-                            if isinstance(data, list) and data:
-                                structured = _normalize_record(data[0], url=url)
-                            elif isinstance(data, dict):
-                                structured = _normalize_record(data, url=url)
-                        elif preview_obj.get("status") == 200 and preview_obj.get("raw"):
-                            # JSON parsing failed but we have raw data - try to extract basic info
-                            raw = preview_obj.get("raw", "")
-                            if raw:
-                                # Try to extract basic fields from raw text if possible
-                                structured = {"url": url, "raw_preview": raw[:500]}  # Limit raw preview size
-                    return ok_response(
-                        tool="smart_scrape",
-                        input={"url": url, "prefer_structured": prefer_structured, "preview": preview},
-                        output={
-                            "path": "WEB_SCRAPER",
-                            "selected_tool": tool,
-                            "selected_params": params,
-                            "result": out,
-                            "structured": structured,
-                            "preview": preview_obj,
-                            "candidates": [c[0] for c in candidates],
-                            "tried": tried,
-                        },
-                    )
-                error_info = r.get("error") if isinstance(r.get("error"), dict) else {}
-                error_msg = error_info.get("message") if isinstance(error_info, dict) else str(r.get("error", ""))
-                tried.append({
-                    "tool": tool,
-                    "ok": r.get("ok"),
-                    "status": status,
-                    "error": error_msg if error_msg else r.get("error"),
-                    "details": error_info if isinstance(error_info, dict) else None,
-                })
+                    # If status is Failed, don't try more Web Scraper tools - go to Unlocker.
+                    # Also check if r.get("ok") is False, which indicates the tool call itself failed.
+                    # Racing (opt-in) keeps going: the other racer or the third candidate may succeed.
+                    if status == "failed" or r.get("ok") is False:
+                        error_msg = _record_failure(tool, r, status)
+                        await safe_ctx_info(ctx, f"smart_scrape: Web Scraper tool {tool} failed (status={status}, ok={r.get('ok')}, error={error_msg})")
+                        if not race_tasks:
+                            break  # Exit loop and go to Unlocker fallback
+                        continue
+                
+                    # Only return success if both ok is True AND status is not failed
+                    if r.get("ok") is True and status not in {"failed", "error", "failure"}:
+                        out = r.get("output") if isinstance(r.get("output"), dict) else {}
+                        dl = out.get("download_url") if isinstance(out, dict) else None
+                        preview_obj = None
+                        structured = {"url": url}
+                        if preview and isinstance(dl, str) and dl:
+                            preview_obj = await _fetch_json_preview(dl, max_chars=pmax)
+                            # Try to use preview data even if JSON parsing failed but we have raw data
+                            if preview_obj.get("ok") is True:
+                                data = preview_obj.get("data")
+                                if isinstance(data, list) and data:
+                                    structured = _normalize_record(data[0], url=url)
+                                elif isinstance(data, dict):
+                                    structured = _normalize_record(data, url=url)
+                            elif preview_obj.get("status") == 200 and preview_obj.get("raw"):
+                                # JSON parsing failed but we have raw data - try to extract basic info
+                                raw = preview_obj.get("raw", "")
+                                if raw:
+                                    # Try to extract basic fields from raw text if possible
+                                    structured = {"url": url, "raw_preview": raw[:500]}  # Limit raw preview size
+                        return ok_response(
+                            tool="smart_scrape",
+                            input={"url": url, "prefer_structured": prefer_structured, "preview": preview},
+                            output={
+                                "path": "WEB_SCRAPER",
+                                "selected_tool": tool,
+                                "selected_params": params,
+                                "result": out,
+                                "structured": structured,
+                                "preview": preview_obj,
+                                "candidates": candidate_names,
+                                "tried": tried,
+                            },
+                        )
+                    _record_failure(tool, r, status)
+            finally:
+                _note_abandoned(race_tasks, [t for t, _ in plan[:2]])
 
         client = await ServerContext.get_client()
         try:
@@ -2480,20 +2624,31 @@ def register(mcp: FastMCP) -> None:
                 # Use new namespace API
                 html = await client.universal.scrape_async(url=url, js_render=True, output_format="html", wait_for=".content")
             html_str = str(html) if not isinstance(html, str) else html
-            extracted = _extract_structured_from_html(html_str) if html_str else {}
+            # Only "html" selects the raw HTML preview; anything else (including unknown
+            # values) means markdown. Canonical spellings skip the strip/lower.
+            out_mode = unlocker_output if unlocker_output in _UNLOCKER_OUTPUT_MODES else (unlocker_output or "").strip().lower()
+            want_md = preview and out_mode != "html"
+            md: str | None = None
+            if want_md and len(html_str) <= pmax:
+                # Page already fits the preview: convert inline, nothing needs capping.
+                md = html_to_markdown_clean(html_str)
+            # Metadata extraction and markdown conversion are independent, pure CPU work on
+            # the page; run them in worker threads so a large page does not stall the event loop.
+            # html_to_markdown_clean only converts a pmax-bounded prefix of a large page.
+            extracted, md = await gather_ordered(
+                (
+                    asyncio.to_thread(_extract_structured_from_html, html_str) if html_str else asyncio.sleep(0, {}),
+                    asyncio.to_thread(html_to_markdown_clean, html_str, pmax) if want_md and md is None else asyncio.sleep(0, md),
+                )
+            )
             structured = _normalize_extracted(extracted, url=url)
             # Token-efficient preview
             preview_obj: dict[str, Any] | None = None
-            out_mode = (unlocker_output or "markdown").strip().lower()
-            if out_mode not in {"markdown", "md", "html"}:
-                out_mode = "markdown"
             if preview:
-                if out_mode in {"markdown", "md"}:
-                    md = html_to_markdown_clean(html_str)
-                    md = truncate_content(md, max_length=int(preview_max_chars))
+                if want_md:
                     preview_obj = {"format": "markdown", "raw": md}
                 else:
-                    preview_obj = {"format": "html", "raw": truncate_content(html_str, max_length=int(preview_max_chars))}
+                    preview_obj = {"format": "html", "raw": truncate_content(html_str, max_length=pmax)}
             # Build input dict efficiently - only include non-None values
             input_dict: dict[str, Any] = {
                 "url": url,
@@ -2519,7 +2674,7 @@ def register(mcp: FastMCP) -> None:
                     "structured": structured,
                     "selected_tool": selected_tool,
                     "selected_params": selected_params,
-                    "candidates": [c[0] for c in candidates],
+                    "candidates": candidate_names,
                     "tried": tried,
                 },
             )
@@ -2537,7 +2692,7 @@ def register(mcp: FastMCP) -> None:
                 ),
                 details={
                     "selected_tool": selected_tool,
-                    "candidates": [c[0] for c in candidates],
+                    "candidates": candidate_names,
                     "tried": tried,
                 },
             )
@@ -2546,14 +2701,14 @@ def register(mcp: FastMCP) -> None:
             await safe_ctx_info(ctx, f"smart_scrape: Unlocker also failed: {e}")
             error_msg = str(e)
             # Extract more useful error information
-            if "504" in error_msg or "Gateway Timeout" in error_msg:
+            if _GATEWAY_TIMEOUT_RE.search(error_msg):
                 error_type = "timeout_error"
                 error_code = "E2003"
                 error_message = (
                     "Unlocker request timed out (504 Gateway Timeout). "
                     "The page may be slow to load or blocked."
                 )
-            elif "timeout" in error_msg.lower():
+            elif _TIMEOUT_RE.search(error_msg):
                 error_type = "timeout_error"
                 error_code = "E2003"
                 error_message = f"Unlocker request timed out: {error_msg}"
@@ -2572,7 +2727,7 @@ def register(mcp: FastMCP) -> None:
                 message=error_message,
                 details={
                     "selected_tool": selected_tool,
-                    "candidates": [c[0] for c in candidates],
+                    "candidates": candidate_names,
                     "tried": tried,
                 },
             )
@@ -5,9 +5,16 @@ import dataclasses
 import importlib
 import inspect
 import pkgutil
-from typing import Any
+from functools import lru_cache
+from typing import Any, Iterable
 
 from thordata.tools import ToolRequest
+
+# Lower-cased task statuses after which a result download is available.
+TASK_SUCCESS_STATUSES: frozenset[str] = frozenset(
+    {"ready", "success", "finished", "succeeded", "task succeeded", "task_succeeded"}
+)
+
 def iter_tool_request_types(max_depth: int = 6) -> list[type[ToolRequest]]:
     """Discover all ToolRequest dataclasses in thordata.tools.
     
@@ -84,7 +91,7 @@ def tool_group_from_key(key: str) -> str:
     return "other"
 
 
-def matches_any_prefix_or_exact(value: str, allowlist: list[str]) -> bool:
+def matches_any_prefix_or_exact(value: str, allowlist: Iterable[str]) -> bool:
     """Return True if value equals or startswith any allowlist entry."""
     for item in allowlist:
         it = item.strip()
@@ -98,12 +105,22 @@ def matches_any_prefix_or_exact(value: str, allowlist: list[str]) -> bool:
 def tool_schema(t: type[ToolRequest]) -> dict[str, Any]:
     """Generate tool schema from ToolRequest class.
 
+    Schemas depend only on static class metadata, so they are built once per
+    class; each call returns a fresh copy that callers may put in responses.
+
     Args:
         t: ToolRequest subclass
 
     Returns:
         Dictionary containing tool schema information
     """
+    s = _tool_schema(t)
+    return {**s, "fields": {name: dict(meta) for name, meta in s["fields"].items()}}
+
+
+@lru_cache(maxsize=2048)
+def _tool_schema(t: type[ToolRequest]) -> dict[str, Any]:
+    """Cached schema behind tool_schema; shared, so never hand it out directly."""
     fields: dict[str, Any] = {}
     for name, f in t.__dataclass_fields__.items():  # type: ignore[attr-defined]
         required = f.default is dataclasses.MISSING and f.default_factory is dataclasses.MISSING  # type: ignore[attr-defined]
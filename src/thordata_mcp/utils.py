@@ -1,13 +1,17 @@
 """Common utility helpers for Thordata MCP tools."""
 from __future__ import annotations
 
+import asyncio
 import functools
 import html2text
 import json
 import logging
+import re
+import sys
 import uuid
+from binascii import b2a_base64
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
 
 from markdownify import markdownify as md
 from thordata import (
@@ -144,14 +148,23 @@ def diagnose_scraping_error(error: Exception, url: Optional[str] = None) -> dict
 # Safe Context helpers (for HTTP mode compatibility)
 # ---------------------------------------------------------------------------
 
-async def safe_ctx_info(ctx: Optional[Any], message: str) -> None:
+async def safe_ctx_info(ctx: Optional[Any], message: str, *args: Any) -> None:
     """Safely call ctx.info() if context is available and valid.
     
     In HTTP mode, ctx may exist but not be a valid MCP Context,
     so we wrap the call in try-except to avoid errors.
+
+    Like the logging module, ``message % args`` is only formatted when there is
+    a context to send it to; batch fan-outs use this form. A message that does
+    not match its args is sent as-is with the args appended, never raised.
     """
     if ctx is None:
         return
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = f"{message} {args!r}"
     try:
         await ctx.info(message)
     except (ValueError, AttributeError):
@@ -159,6 +172,66 @@ async def safe_ctx_info(ctx: Optional[Any], message: str) -> None:
         pass
 
 
+# ---------------------------------------------------------------------------
+# Batch fan-out helper
+# ---------------------------------------------------------------------------
+
+async def gather_ordered(aws: Iterable[Awaitable[Any]]) -> list[Any]:
+    """Await all coroutines concurrently and return their results in input order.
+
+    Unlike a bare asyncio.gather, the first failure cancels every sibling that
+    is still running and is then re-raised on its own; callers that need all
+    outcomes must catch exceptions inside each awaitable. Uses asyncio.TaskGroup
+    on Python 3.11+ and gather plus explicit cancellation on 3.10.
+    """
+    if sys.version_info < (3, 11):
+        tasks = [asyncio.ensure_future(aw) for aw in aws]
+        try:
+            return list(await asyncio.gather(*tasks))
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            raise
+
+    results: list[Any] = []
+
+    async def _assign(i: int, aw: Awaitable[Any]) -> None:
+        results[i] = await aw
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for i, aw in enumerate(aws):
+                results.append(None)
+                tg.create_task(_assign(i, aw))
+    except BaseExceptionGroup as eg:  # noqa: F821 - builtin on 3.11+
+        # Re-raise the first failure like gather() so handle_mcp_errors can classify it.
+        raise eg.exceptions[0] from None
+    return results
+
+
+async def map_bounded(
+    fn: Callable[[int, Any], Awaitable[Any]],
+    items: Sequence[Any],
+    *,
+    concurrency: int,
+) -> list[Any]:
+    """Run ``fn(i, item)`` for every item with at most ``concurrency`` in flight.
+
+    Only ``concurrency`` worker tasks are created (instead of one task per item
+    waiting on a semaphore); results keep input order.
+    """
+    results: list[Any] = [None] * len(items)
+    pending = iter(enumerate(items))
+
+    async def _worker() -> None:
+        # Workers share one iterator; the event loop is single-threaded so next() is safe.
+        for i, item in pending:
+            results[i] = await fn(i, item)
+
+    await gather_ordered(_worker() for _ in range(max(1, min(concurrency, len(items)))))
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Structured response helpers (LLM-friendly)
 # ---------------------------------------------------------------------------
@@ -363,9 +436,15 @@ def handle_mcp_errors(func: Callable) -> Callable:  # noqa: D401
 # Helpers for HTML → Markdown & truncation
 # ---------------------------------------------------------------------------
 
+_DATA_URL_RE = re.compile(r"data:[^\s\"']+")
+# Candidate main-content blocks for _extract_readable_html, compiled once per tag.
+_READABLE_BLOCK_RES = tuple(
+    re.compile(rf"<{tag}[^>]*>([\\s\\S]*?)</{tag}>", re.IGNORECASE) for tag in ("main", "article")
+)
+
+
 def _strip_large_data_urls(html: str, *, max_keep_chars: int = 256) -> str:
     """Remove large inlined data URLs to reduce token bloat."""
-    import re
 
     def _repl(m: re.Match[str]) -> str:
         s = m.group(0)
@@ -374,17 +453,14 @@ def _strip_large_data_urls(html: str, *, max_keep_chars: int = 256) -> str:
         return 'data:...'
 
     # Replace any data:... sequences inside quotes.
-    return re.sub(r"data:[^\s\"']+", _repl, html)
+    return _DATA_URL_RE.sub(_repl, html)
 
 
 def _extract_readable_html(html: str) -> str:
     """Best-effort extraction of main readable content."""
-    import re
-
     # Lightweight heuristics: keep the largest <main>/<article> block.
     candidates: list[str] = []
-    for tag in ("main", "article"):
-        pattern = re.compile(rf"<{tag}[^>]*>([\\s\\S]*?)</{tag}>", re.IGNORECASE)
+    for pattern in _READABLE_BLOCK_RES:
         for m in pattern.finditer(html):
             block = m.group(0)
             if block:
@@ -395,30 +471,90 @@ def _extract_readable_html(html: str) -> str:
     return candidates[0]
 
 
-def html_to_markdown_clean(html: str) -> str:
+# Markdown is much shorter than the HTML it came from, so this many HTML chars
+# per requested output char is ample to fill ``max_chars``.
+_MD_HTML_BUDGET_FACTOR = 10
+
+
+def html_to_markdown_clean(html: str, max_chars: Optional[int] = None) -> str:
+    """Convert HTML to compact Markdown.
+
+    With ``max_chars`` only the first ``max_chars * _MD_HTML_BUDGET_FACTOR`` chars
+    of readable HTML are converted, so the work is bounded by the cap. When the
+    input fits, the result is truncated exactly like ``truncate_content``; when
+    the input had to be cut, the original length is unknown and the marker gives
+    the cut-off instead.
+    """
+    cut = False
     try:
         html = _strip_large_data_urls(html)
         html = _extract_readable_html(html)
+        if max_chars is not None and len(html) > max_chars * _MD_HTML_BUDGET_FACTOR:
+            html = html[: max_chars * _MD_HTML_BUDGET_FACTOR]
+            cut = True
         text = md(
             html,
             heading_style="ATX",
             strip=["script", "style", "noscript", "nav", "footer", "iframe", "svg"],
         )
-        lines = [line.rstrip() for line in text.splitlines()]
-        return "\n".join(line for line in lines if line)
+        lines = [s for s in (line.rstrip() for line in text.splitlines()) if s]
     except Exception:
         h = html2text.HTML2Text()
         h.ignore_links = False
-        return h.handle(html)
+        text = h.handle(html)
+        return text if max_chars is None else truncate_content(text, max_length=max_chars)
+
+    if max_chars is None:
+        return "\n".join(lines)
+    if cut:
+        return "\n".join(lines)[:max_chars] + f"\n\n... [Content Truncated at {max_chars} chars]"
+    # Length of "\n".join(lines), computed without building it.
+    total = sum(map(len, lines)) + max(len(lines) - 1, 0)
+    if total <= max_chars:
+        return "\n".join(lines)
+    kept: list[str] = []
+    size = -1
+    for line in lines:
+        kept.append(line)
+        size += len(line) + 1
+        if size >= max_chars:
+            break
+    return _truncated("\n".join(kept)[:max_chars], total)
+
+
+def _truncated(head: str, original_length: int) -> str:
+    return head + f"\n\n... [Content Truncated, original length: {original_length} chars]"
 
 
 def truncate_content(content: str, max_length: int = 20_000) -> str:
     if len(content) <= max_length:
         return content
-    return (
-        content[:max_length]
-        + f"\n\n... [Content Truncated, original length: {len(content)} chars]"
-    )
+    return _truncated(content[:max_length], len(content))
+
+
+def truncate_json(obj: Any, max_length: int = 20_000) -> str:
+    """Serialize ``obj`` to JSON, stopping once ``max_length`` chars have been produced.
+
+    Encoding stops at the cap, so a large response costs O(max_length) work and
+    memory; the marker therefore gives the cut-off, not the original length.
+    Strings are returned as text (via ``truncate_content``), not JSON-quoted.
+    """
+    if isinstance(obj, str):
+        return truncate_content(obj, max_length=max_length)
+    parts: list[str] = []
+    size = 0
+    # iterencode() streams from the pure-Python encoder, so breaking out stops the work.
+    for chunk in json.JSONEncoder(ensure_ascii=False, default=str).iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > max_length:
+            return "".join(parts)[:max_length] + f"\n\n... [Content Truncated at {max_length} chars]"
+    return "".join(parts)
+
+
+def encode_png_base64(data: bytes | bytearray) -> str:
+    """Base64-encode PNG bytes for a JSON response (output is pure ASCII)."""
+    return b2a_base64(data, newline=False).decode("ascii")
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,38 @@
+"""Shared fixtures for the Thordata MCP test suite."""
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from thordata_mcp.config import Settings
+from thordata_mcp.tools import product_compact
+
+
+@pytest.fixture
+def compact_tools(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    """Register the full (pro mode) compact surface and return its tool functions by name."""
+    monkeypatch.setattr(product_compact, "get_settings", lambda: Settings(THORDATA_MODE="pro"))
+    mcp = FastMCP("test")
+    product_compact.register(mcp)
+    return {t.name: t.fn for t in mcp._tool_manager.list_tools()}
+
+
+@pytest.fixture
+def fake_client(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """Stand-in ThordataClient whose Unlocker returns a tiny HTML page."""
+    calls: list[dict[str, Any]] = []
+
+    async def scrape_async(**kwargs: Any) -> str:
+        calls.append(kwargs)
+        return "<html><head><title>Fallback</title></head><body><main>ok</main></body></html>"
+
+    client = SimpleNamespace(universal=SimpleNamespace(scrape_async=scrape_async), calls=calls)
+
+    async def get_client() -> SimpleNamespace:
+        return client
+
+    monkeypatch.setattr(product_compact.ServerContext, "get_client", get_client)
+    return client
@@ -0,0 +1,130 @@
+"""Tests for Web Scraper result previews."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from thordata_mcp.tools import product
+
+
+def _serve(body: bytes, fn: Callable[[str], Awaitable[Any]]) -> Any:
+    """Serve ``body`` at /result.json and run ``fn(url)`` against it."""
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=body, content_type="application/json")
+
+    async def main() -> Any:
+        app = web.Application()
+        app.router.add_get("/result.json", handler)
+        async with TestServer(app) as server:
+            return await fn(str(server.make_url("/result.json")))
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def read_sizes(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    sizes: list[int] = []
+    orig = aiohttp.StreamReader.read
+
+    async def read(self: aiohttp.StreamReader, n: int = -1) -> bytes:
+        sizes.append(n)
+        return await orig(self, n)
+
+    monkeypatch.setattr(aiohttp.StreamReader, "read", read)
+    return sizes
+
+
+def test_small_body_is_decoded_whole() -> None:
+    body = json.dumps([{"title": "a"}, {"title": "b"}]).encode()
+    out = _serve(body, lambda url: product._download_json_preview(url, max_chars=20_000))
+    assert out == {"ok": True, "status": 200, "data": [{"title": "a"}, {"title": "b"}], "truncated": False}
+
+
+def test_large_body_stops_at_max_chars(read_sizes: list[int]) -> None:
+    rows = [{"title": f"row {i}", "body": "x" * 200} for i in range(2_000)]
+    body = json.dumps(rows).encode()
+    out = _serve(body, lambda url: product._download_json_preview(url, max_chars=1_000))
+    assert out["ok"] is True and out["partial"] is True and out["truncated"] is True
+    assert out["data"] == [rows[0]]
+    assert sum(read_sizes) <= 1_000
+
+
+def test_read_continues_until_first_object_is_complete(read_sizes: list[int]) -> None:
+    rows = [{"body": "y" * 5_000}, {"body": "z"}]
+    out = _serve(json.dumps(rows).encode(), lambda url: product._download_json_preview(url, max_chars=1_000))
+    assert out["ok"] is True
+    assert out["data"][0] == rows[0]
+    assert read_sizes[0] == 1_000
+
+
+def test_body_of_exactly_max_chars_is_not_truncated() -> None:
+    body = json.dumps([{"title": "a"}]).encode()
+    out = _serve(body, lambda url: product._download_json_preview(url, max_chars=len(body)))
+    assert out == {"ok": True, "status": 200, "data": [{"title": "a"}], "truncated": False}
+
+
+@pytest.mark.parametrize("max_chars", [0, -5])
+def test_non_positive_max_chars_reads_at_least_one_byte(read_sizes: list[int], max_chars: int) -> None:
+    rows = [{"title": f"row {i}"} for i in range(20_000)]
+    out = _serve(json.dumps(rows).encode(), lambda url: product._download_json_preview(url, max_chars=max_chars))
+    assert out["ok"] is True and out["truncated"] is True
+    assert out["data"] == [rows[0]]
+    assert read_sizes and all(n >= 1 for n in read_sizes)
+    assert read_sizes[0] == 1
+
+
+class TestPreviewCache:
+    @pytest.fixture(autouse=True)
+    def _clean_cache(self) -> Any:
+        product._PREVIEW_CACHE.clear()
+        yield
+        product._PREVIEW_CACHE.clear()
+
+    @pytest.fixture
+    def downloads(self, monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+        """Queue of results returned by the stubbed downloader, one per call."""
+        queue: list[dict[str, Any]] = []
+
+        async def download(url: str, *, max_chars: int) -> dict[str, Any]:
+            return queue.pop(0)
+
+        monkeypatch.setattr(product, "_download_json_preview", download)
+        return queue
+
+    def test_hit_returns_independent_copy(self, downloads: list[dict[str, Any]]) -> None:
+        downloads.append({"ok": True, "status": 200, "data": [{"title": "a"}], "truncated": False})
+        first = asyncio.run(product._fetch_json_preview("https://dl.test/1"))
+        first["data"][0]["title"] = "mutated"
+        second = asyncio.run(product._fetch_json_preview("https://dl.test/1"))
+        assert second["data"] == [{"title": "a"}]
+        second["data"].append({"title": "b"})
+        assert asyncio.run(product._fetch_json_preview("https://dl.test/1"))["data"] == [{"title": "a"}]
+        assert not downloads
+
+    def test_failure_is_not_cached(self, downloads: list[dict[str, Any]]) -> None:
+        downloads.append({"ok": False, "error": "boom"})
+        downloads.append({"ok": True, "status": 200, "data": [], "truncated": False})
+        assert asyncio.run(product._fetch_json_preview("https://dl.test/1"))["ok"] is False
+        assert asyncio.run(product._fetch_json_preview("https://dl.test/1"))["ok"] is True
+
+    def test_entry_expires(self, downloads: list[dict[str, Any]], monkeypatch: pytest.MonkeyPatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr(product.time, "monotonic", lambda: now[0])
+        downloads.append({"ok": True, "status": 200, "data": [1], "truncated": False})
+        downloads.append({"ok": True, "status": 200, "data": [2], "truncated": False})
+        assert asyncio.run(product._fetch_json_preview("https://dl.test/1"))["data"] == [1]
+        now[0] += product._PREVIEW_CACHE_TTL + 1
+        assert asyncio.run(product._fetch_json_preview("https://dl.test/1"))["data"] == [2]
+
+    def test_oldest_entry_evicted(self, downloads: list[dict[str, Any]], monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(product, "_PREVIEW_CACHE_SIZE", 2)
+        for i in range(3):
+            downloads.append({"ok": True, "status": 200, "data": [i], "truncated": False})
+            asyncio.run(product._fetch_json_preview(f"https://dl.test/{i}"))
+        assert [k[0] for k in product._PREVIEW_CACHE] == ["https://dl.test/1", "https://dl.test/2"]
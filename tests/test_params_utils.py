@@ -0,0 +1,32 @@
+"""Tests for params normalization."""
+from __future__ import annotations
+
+import pytest
+
+from thordata_mcp.tools.params_utils import loads_json, normalize_params
+
+
+def test_loads_json_rejects_invalid() -> None:
+    assert loads_json('{"a": [1, 2]}') == {"a": [1, 2]}
+    with pytest.raises(ValueError):
+        loads_json('{"a": 1')
+
+
+def test_normalize_params_parses_json_string() -> None:
+    assert normalize_params('{"url": "https://example.com"}', "web_scraper") == {"url": "https://example.com"}
+    assert normalize_params(None, "web_scraper") == {}
+
+
+def test_normalize_params_flat_result_is_not_shared() -> None:
+    first = normalize_params('{"url": "https://example.com"}', "web_scraper")
+    first["url"] = "changed"
+    assert normalize_params('{"url": "https://example.com"}', "web_scraper") == {"url": "https://example.com"}
+
+
+def test_normalize_params_errors() -> None:
+    with pytest.raises(ValueError, match="Invalid JSON in params"):
+        normalize_params('{"url": ', "web_scraper")
+    with pytest.raises(ValueError, match="not a dictionary"):
+        normalize_params("[1, 2]", "web_scraper")
+    with pytest.raises(ValueError, match="must be a dictionary object"):
+        normalize_params(42, "web_scraper")
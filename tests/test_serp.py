@@ -0,0 +1,100 @@
+"""Tests for SERP parameter handling in the compact tools."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from thordata_mcp.tools import product_compact as pc
+
+
+@pytest.mark.parametrize(("value", "expected"), [(None, 7), ("", 7), (3, 3), ("12", 12), (" 4 ", 4), (2.0, 2)])
+def test_as_int_accepts_int_like(value: Any, expected: int) -> None:
+    src = {} if value is None else {"num": value}
+    assert pc._as_int(src, "num", 7) == expected
+
+
+@pytest.mark.parametrize("value", ["abc", "1.5", True, False, [1], {}])
+def test_as_int_rejects_bad_values(value: Any) -> None:
+    with pytest.raises(ValueError, match="num must be an integer"):
+        pc._as_int({"num": value}, "num", 7)
+
+
+@pytest.fixture
+def serp_client(monkeypatch: pytest.MonkeyPatch) -> list[Any]:
+    requests: list[Any] = []
+
+    async def search(req: Any) -> dict[str, Any]:
+        requests.append(req)
+        return {"organic": [{"title": "T", "link": "https://r.test", "description": "D"}]}
+
+    async def get_client() -> SimpleNamespace:
+        return SimpleNamespace(serp=SimpleNamespace(search=search))
+
+    monkeypatch.setattr(pc.ServerContext, "get_client", get_client)
+    return requests
+
+
+def test_search_rejects_non_int_num(compact_tools, serp_client) -> None:
+    r = asyncio.run(compact_tools["serp"]("search", params={"q": "python", "num": "abc"}))
+    assert r["ok"] is False
+    assert r["error"]["type"] == "validation_error"
+    assert r["error"]["message"] == "num must be an integer, got 'abc'"
+    assert not serp_client
+
+
+def test_batch_rejects_bool_concurrency(compact_tools, serp_client) -> None:
+    r = asyncio.run(compact_tools["serp"]("batch_search", params={"requests": [{"q": "a"}], "concurrency": True}))
+    assert r["ok"] is False and r["error"]["type"] == "validation_error"
+
+
+def test_batch_item_with_bad_start_fails_alone(compact_tools, serp_client) -> None:
+    r = asyncio.run(compact_tools["serp"]("batch_search", params={"requests": [{"q": "a", "start": "x"}, {"q": "b"}]}))
+    bad, good = r["output"]["results"]
+    assert bad["ok"] is False and bad["error"]["type"] == "validation_error"
+    assert good["ok"] is True
+    assert len(serp_client) == 1
+
+
+@pytest.mark.parametrize("fmt", ["light_json", "json"])
+def test_search_engine_drops_rows_without_title_or_link(compact_tools, monkeypatch, fmt: str) -> None:
+    async def search(req: Any) -> dict[str, Any]:
+        return {"organic": [
+            {"title": "", "link": "", "description": "empty"},
+            {"link": "https://r.test/1", "title": "One", "description": "D1"},
+            {"link": "https://r.test/2", "title": "Two"},
+        ]}
+
+    async def get_client() -> SimpleNamespace:
+        return SimpleNamespace(serp=SimpleNamespace(search=search))
+
+    monkeypatch.setattr(pc.ServerContext, "get_client", get_client)
+    r = asyncio.run(compact_tools["search_engine"]("python", num=10, format=fmt))
+    results = r["output"]["results"]
+    assert results == [
+        {"title": "One", "link": "https://r.test/1", "description": "D1"},
+        {"title": "Two", "link": "https://r.test/2", "description": None},
+    ]
+    assert [list(row) for row in results] == [["title", "link", "description"]] * 2
+
+
+def test_invalid_tbm_examples_are_not_shared(compact_tools, monkeypatch) -> None:
+    async def search(req: Any) -> dict[str, Any]:
+        raise pc.ThordataAPIError("Invalid tbm parameter")
+
+    async def get_client() -> SimpleNamespace:
+        return SimpleNamespace(serp=SimpleNamespace(search=search))
+
+    monkeypatch.setattr(pc.ServerContext, "get_client", get_client)
+    first = asyncio.run(compact_tools["serp"]("search", params={"q": "python", "tbm": "bogus"}))
+    examples = first["error"]["details"]["examples"]
+    assert examples["tbm"][0] == "images"
+    examples["tbm"].append("mutated")
+    examples["engine"] = []
+    second = asyncio.run(compact_tools["serp"]("search", params={"q": "python", "tbm": "bogus"}))
+    assert second["error"]["details"]["examples"] == {
+        "engine": ["google", "google_images", "google_news", "google_videos", "google_shopping"],
+        "tbm": ["images", "news", "videos", "shops", "local", "patents"],
+    }
@@ -0,0 +1,162 @@
+"""Tests for smart_scrape's Web Scraper candidate handling."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from thordata_mcp.tools import product_compact as pc
+
+URL = "https://shop.test/item/1"
+HOST = "shop.test"
+CANDIDATES = ["t.A", "t.B", "t.C"]
+
+
+@pytest.fixture(autouse=True)
+def _clean_fail_cache() -> Any:
+    pc._SCRAPER_FAIL_CACHE.clear()
+    yield
+    pc._SCRAPER_FAIL_CACHE.clear()
+
+
+@pytest.fixture
+def candidates(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pc, "_guess_tool_for_url", lambda url: (None, {}))
+    monkeypatch.setattr(pc, "_candidate_tools_for_url", lambda url, limit=3: list(CANDIDATES))
+
+
+def _scraper(monkeypatch: pytest.MonkeyPatch, results: dict[str, dict[str, Any]], delays: dict[str, float] | None = None) -> list[str]:
+    """Stub _run_web_scraper_tool with canned per-tool results; return the call log."""
+    calls: list[str] = []
+
+    async def run(*, tool: str, **_: Any) -> dict[str, Any]:
+        calls.append(tool)
+        await asyncio.sleep((delays or {}).get(tool, 0))
+        return results[tool]
+
+    monkeypatch.setattr(pc, "_run_web_scraper_tool", run)
+    return calls
+
+
+def _ok(tool: str) -> dict[str, Any]:
+    return {"ok": True, "output": {"status": "ready", "task_id": tool}}
+
+
+_FAILED = {"ok": True, "output": {"status": "failed"}}
+_CALL_ERROR = {"ok": False, "error": {"type": "validation_error", "message": "bad params"}}
+
+
+class TestFailureCache:
+    def test_entry_expires(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        now = [1000.0]
+        monkeypatch.setattr(pc.time, "monotonic", lambda: now[0])
+        pc._mark_failed("t.A", HOST)
+        assert pc._recently_failed("t.A", HOST)
+        assert not pc._recently_failed("t.A", "other.test")
+        now[0] += pc._SCRAPER_FAIL_TTL + 1
+        assert not pc._recently_failed("t.A", HOST)
+        assert ("t.A", HOST) not in pc._SCRAPER_FAIL_CACHE
+
+    def test_oldest_entry_evicted(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(pc, "_SCRAPER_FAIL_CACHE_SIZE", 2)
+        pc._mark_failed("t.A", HOST)
+        pc._mark_failed("t.B", HOST)
+        pc._mark_failed("t.A", HOST)  # refresh: t.B is now the oldest
+        pc._mark_failed("t.C", HOST)
+        assert list(pc._SCRAPER_FAIL_CACHE) == [("t.A", HOST), ("t.C", HOST)]
+
+    def test_only_upstream_failed_status_is_cached(self, compact_tools, fake_client, candidates, monkeypatch) -> None:
+        _scraper(monkeypatch, {"t.A": _CALL_ERROR})
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False))
+        assert r["output"]["path"] == "WEB_UNLOCKER"
+        assert not pc._SCRAPER_FAIL_CACHE
+
+        _scraper(monkeypatch, {"t.A": _FAILED})
+        asyncio.run(compact_tools["smart_scrape"](URL, preview=False))
+        assert list(pc._SCRAPER_FAIL_CACHE) == [("t.A", HOST)]
+
+    def test_cached_failure_skipped_unless_bypassed(self, compact_tools, fake_client, candidates, monkeypatch) -> None:
+        pc._mark_failed("t.A", HOST)
+        calls = _scraper(monkeypatch, {"t.A": _ok("t.A"), "t.B": _ok("t.B")})
+
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False))
+        assert r["output"]["selected_tool"] == "t.B"
+        assert r["output"]["tried"][0] == {
+            "tool": "t.A", "ok": False, "status": "skipped", "error": "Failed recently for this host; not retried.",
+        }
+
+        calls.clear()
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False, use_failure_cache=False))
+        assert r["output"]["selected_tool"] == "t.A"
+        assert calls == ["t.A"]
+
+
+class TestCandidates:
+    @pytest.mark.parametrize("first", [_FAILED, _CALL_ERROR])
+    def test_sequential_first_failure_goes_to_unlocker(self, compact_tools, fake_client, candidates, monkeypatch, first) -> None:
+        calls = _scraper(monkeypatch, {"t.A": first, "t.B": _ok("t.B"), "t.C": _ok("t.C")})
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False))
+        assert r["output"]["path"] == "WEB_UNLOCKER"
+        assert calls == ["t.A"]
+        assert [t["tool"] for t in r["output"]["tried"]] == ["t.A"]
+        assert len(fake_client.calls) == 1
+
+    def test_race_first_success_wins(self, compact_tools, fake_client, candidates, monkeypatch) -> None:
+        calls = _scraper(monkeypatch, {"t.A": _ok("t.A"), "t.B": _ok("t.B")}, delays={"t.A": 1.0})
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False, race_candidates=True))
+        assert r["output"]["selected_tool"] == "t.B"
+        assert calls == ["t.A", "t.B"]
+        assert r["output"]["tried"] == [{
+            "tool": "t.A",
+            "ok": None,
+            "status": "abandoned",
+            "error": "Lost the candidate race; the upstream task may still run and be billed.",
+        }]
+
+    def test_race_both_fail_falls_back_to_third(self, compact_tools, fake_client, candidates, monkeypatch) -> None:
+        calls = _scraper(monkeypatch, {"t.A": _FAILED, "t.B": _CALL_ERROR, "t.C": _ok("t.C")}, delays={"t.A": 0.01})
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False, race_candidates=True))
+        assert r["output"]["selected_tool"] == "t.C"
+        assert calls == CANDIDATES
+        assert [t["tool"] for t in r["output"]["tried"]] == ["t.B", "t.A"]
+
+    def test_race_all_fail_uses_unlocker(self, compact_tools, fake_client, candidates, monkeypatch) -> None:
+        _scraper(monkeypatch, {t: _FAILED for t in CANDIDATES})
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=False, race_candidates=True))
+        assert r["output"]["path"] == "WEB_UNLOCKER"
+        assert sorted(t["tool"] for t in r["output"]["tried"]) == CANDIDATES
+        assert len(fake_client.calls) == 1
+
+
+class TestUnlockerPreview:
+    @pytest.fixture
+    def md_inputs(self, monkeypatch: pytest.MonkeyPatch) -> list[int]:
+        """Record the length of every HTML string handed to markdownify."""
+        from thordata_mcp import utils
+
+        seen: list[int] = []
+        real_md = utils.md
+
+        def md(html: str, **kwargs: Any) -> str:
+            seen.append(len(html))
+            return real_md(html, **kwargs)
+
+        monkeypatch.setattr(utils, "md", md)
+        monkeypatch.setattr(pc, "_guess_tool_for_url", lambda url: (None, {}))
+        monkeypatch.setattr(pc, "_candidate_tools_for_url", lambda url, limit=3: [])
+        return seen
+
+    def test_small_page_is_converted_whole(self, compact_tools, fake_client, md_inputs) -> None:
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=True, preview_max_chars=1_000))
+        assert r["output"]["preview"]["raw"].endswith("ok")
+        assert len(md_inputs) == 1
+
+    def test_large_page_conversion_is_bounded(self, compact_tools, fake_client, md_inputs, monkeypatch) -> None:
+        async def scrape_async(**kwargs: Any) -> str:
+            return "<main>" + "<p>lorem ipsum</p>" * 100_000 + "</main>"
+
+        monkeypatch.setattr(fake_client.universal, "scrape_async", scrape_async)
+        r = asyncio.run(compact_tools["smart_scrape"](URL, preview=True, preview_max_chars=500))
+        assert md_inputs == [500 * 10]
+        assert r["output"]["preview"]["raw"].endswith("[Content Truncated at 500 chars]")
@@ -0,0 +1,41 @@
+"""Tests for shared tool helpers."""
+from __future__ import annotations
+
+from thordata_mcp.tools import product_compact as pc
+from thordata_mcp.tools.utils import matches_any_prefix_or_exact
+
+
+def test_matches_any_prefix_or_exact() -> None:
+    allow = ["thordata.tools.ecommerce.", " thordata.tools.video.YouTube.VideoInfo ", ""]
+    assert matches_any_prefix_or_exact("thordata.tools.ecommerce.Amazon.ProductByAsin", allow)
+    assert matches_any_prefix_or_exact("thordata.tools.video.YouTube.VideoInfo", allow)
+    assert not matches_any_prefix_or_exact("thordata.tools.video.YouTube.VideoDownload", allow)
+    assert not matches_any_prefix_or_exact("anything", [])
+
+
+def test_compact_allowlist_is_case_insensitive() -> None:
+    allow = pc._parse_allowlist("Thordata.Tools.Ecommerce., thordata.tools.code.GitHub.RepositoryByUrl")
+    assert allow == ("thordata.tools.ecommerce.", "thordata.tools.code.github.repositorybyurl")
+    assert matches_any_prefix_or_exact("thordata.tools.ecommerce.Amazon.ProductByAsin".lower(), allow)
+    assert matches_any_prefix_or_exact("thordata.tools.code.GitHub.RepositoryByUrl".lower(), allow)
+    assert not matches_any_prefix_or_exact("thordata.tools.video.YouTube.VideoInfo".lower(), allow)
+
+
+def test_hostname_is_normalized_and_cached() -> None:
+    pc._hostname.cache_clear()
+    assert pc._hostname("https://WWW.Google.com/search?q=x") == "google.com"
+    assert pc._hostname("https://m.youtube.com/watch?v=1") == "youtube.com"
+    assert pc._hostname("not a url") == ""
+    pc._hostname("https://WWW.Google.com/search?q=x")
+    assert pc._hostname.cache_info().hits == 1
+
+
+def test_tool_schema_returns_fresh_copies() -> None:
+    from thordata_mcp.tools.utils import iter_tool_request_types, tool_schema
+
+    t = iter_tool_request_types()[0]
+    first = tool_schema(t)
+    assert first == tool_schema(t)
+    first["fields"].clear()
+    assert tool_schema(t)["fields"]
+    assert set(tool_schema(t)["fields"]) <= set(t.__dataclass_fields__)
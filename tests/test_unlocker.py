@@ -0,0 +1,59 @@
+"""Tests for unlocker / unlocker_batch request building."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from thordata_mcp.tools import product_compact as pc
+
+
+def test_scrape_kwargs_layers_options_and_copies_extra_params() -> None:
+    extra = {"render_delay": 2}
+    src = {"extra_params": extra, "follow_redirect": False, "headers": ["A: b"]}
+    kwargs = pc._unlocker_scrape_kwargs(src, is_markdown=False, url="https://a.test", js_render=True)
+    assert kwargs == {
+        "render_delay": 2,
+        "follow_redirect": False,
+        "headers": ["A: b"],
+        "url": "https://a.test",
+        "js_render": True,
+    }
+    assert extra == {"render_delay": 2}
+
+
+def test_scrape_kwargs_rejects_core_collisions() -> None:
+    src = {"extra_params": {"js_render": False, "url": "https://b.test", "render_delay": 2}}
+    with pytest.raises(ValueError, match="js_render, url"):
+        pc._unlocker_scrape_kwargs(src, is_markdown=False, url="https://a.test", js_render=True)
+
+
+@pytest.mark.parametrize(
+    ("clean_content", "expected"),
+    [(None, "js,css"), ("css", "css,js"), ("img, js", "img,js,css")],
+)
+def test_markdown_adds_clean_content_defaults(clean_content: str | None, expected: str) -> None:
+    kwargs = pc._unlocker_scrape_kwargs({"clean_content": clean_content}, is_markdown=True, url="https://a.test")
+    assert kwargs["clean_content"] == expected
+
+
+def test_batch_markdown_request_gets_clean_content(compact_tools, fake_client) -> None:
+    r = asyncio.run(compact_tools["unlocker_batch"](
+        [{"url": "https://a.test", "output_format": "markdown"}, {"url": "https://b.test"}],
+    ))
+    assert [x["ok"] for x in r["output"]["results"]] == [True, True]
+    md_call, html_call = fake_client.calls
+    assert md_call["clean_content"] == "js,css" and md_call["output_format"] == "html"
+    assert "clean_content" not in html_call
+
+
+def test_batch_rejects_colliding_extra_params(compact_tools, fake_client) -> None:
+    r = asyncio.run(compact_tools["unlocker_batch"](
+        [{"url": "https://a.test", "extra_params": {"output_format": "png"}}, {"url": "https://b.test"}],
+    ))
+    bad, good = r["output"]["results"]
+    assert bad["ok"] is False
+    assert bad["error"]["type"] == "validation_error"
+    assert "output_format" in bad["error"]["message"]
+    assert good["ok"] is True
+    assert len(fake_client.calls) == 1
@@ -0,0 +1,195 @@
+"""Tests for thordata_mcp.utils helpers."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+import pytest
+
+from thordata_mcp import utils
+from thordata_mcp.utils import (
+    encode_png_base64,
+    gather_ordered,
+    html_to_markdown_clean,
+    map_bounded,
+    safe_ctx_info,
+    truncate_content,
+    truncate_json,
+)
+
+
+class TestMapBounded:
+    def test_results_keep_input_order(self) -> None:
+        async def fn(i: int, item: float) -> tuple[int, float]:
+            await asyncio.sleep(item)
+            return i, item
+
+        delays = [0.03, 0.0, 0.02, 0.01, 0.0]
+        assert asyncio.run(map_bounded(fn, delays, concurrency=3)) == list(enumerate(delays))
+
+    def test_at_most_concurrency_in_flight(self) -> None:
+        in_flight = peak = 0
+
+        async def fn(i: int, item: Any) -> int:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return item * 2
+
+        assert asyncio.run(map_bounded(fn, list(range(20)), concurrency=4)) == [x * 2 for x in range(20)]
+        assert peak == 4
+
+    @pytest.mark.parametrize("concurrency", [1, 5])
+    def test_empty_input(self, concurrency: int) -> None:
+        async def fn(i: int, item: Any) -> Any:
+            raise AssertionError("must not be called")
+
+        assert asyncio.run(map_bounded(fn, [], concurrency=concurrency)) == []
+
+    def test_non_positive_concurrency_still_runs(self) -> None:
+        async def fn(i: int, item: str) -> str:
+            return item.upper()
+
+        assert asyncio.run(map_bounded(fn, ["a", "b"], concurrency=0)) == ["A", "B"]
+
+    def test_exception_propagates_and_stops_other_items(self) -> None:
+        started: list[int] = []
+
+        async def fn(i: int, item: Any) -> Any:
+            started.append(i)
+            await asyncio.sleep(0)
+            if i == 1:
+                raise KeyError("boom")
+            await asyncio.sleep(0.01)
+            return i
+
+        with pytest.raises(KeyError, match="boom"):
+            asyncio.run(map_bounded(fn, list(range(10)), concurrency=2))
+        assert len(started) < 10
+
+
+def test_gather_ordered() -> None:
+    async def value(v: int, delay: float) -> int:
+        await asyncio.sleep(delay)
+        return v
+
+    async def fail() -> None:
+        raise ValueError("bad")
+
+    assert asyncio.run(gather_ordered([value(1, 0.02), value(2, 0.0), value(3, 0.01)])) == [1, 2, 3]
+    assert asyncio.run(gather_ordered([])) == []
+    with pytest.raises(ValueError, match="bad"):
+        asyncio.run(gather_ordered([value(1, 0.01), fail()]))
+
+
+def test_gather_ordered_cancels_siblings_on_failure() -> None:
+    events: list[str] = []
+
+    async def slow() -> None:
+        try:
+            await asyncio.sleep(1)
+            events.append("finished")
+        except asyncio.CancelledError:
+            events.append("cancelled")
+            raise
+
+    async def fail() -> None:
+        await asyncio.sleep(0)
+        raise ValueError("bad")
+
+    async def main() -> None:
+        with pytest.raises(ValueError, match="bad"):
+            await gather_ordered([slow(), fail()])
+        await asyncio.sleep(0)  # let the cancellation land on 3.10's gather path
+
+    asyncio.run(main())
+    assert events == ["cancelled"]
+
+
+class TestTruncateJson:
+    def test_short_object_is_plain_json(self) -> None:
+        obj = {"q": "pâte", "organic": [{"title": "T", "rank": 1}], "when": object}
+        assert json.loads(truncate_json(obj)) == {"q": "pâte", "organic": [{"title": "T", "rank": 1}], "when": str(object)}
+
+    def test_long_object_is_cut_at_max_length(self) -> None:
+        obj = {"organic": [{"title": f"row {i}", "description": "x" * 50} for i in range(500)]}
+        full = json.dumps(obj, ensure_ascii=False)
+        assert truncate_json(obj, max_length=300) == full[:300] + "\n\n... [Content Truncated at 300 chars]"
+        assert truncate_json(obj, max_length=len(full)) == full
+
+    def test_encoding_stops_at_max_length(self) -> None:
+        encoded: list[int] = []
+
+        class Item:
+            def __init__(self, i: int) -> None:
+                self.i = i
+
+            def __str__(self) -> str:
+                encoded.append(self.i)
+                return "y" * 100
+
+        out = truncate_json([Item(i) for i in range(10_000)], max_length=1_000)
+        assert out.endswith("[Content Truncated at 1000 chars]")
+        assert len(encoded) <= 11
+
+    def test_strings_are_not_quoted(self) -> None:
+        assert truncate_json("abc", max_length=10) == "abc"
+        assert truncate_json("a" * 20, max_length=10) == truncate_content("a" * 20, max_length=10)
+
+
+class TestHtmlToMarkdownClean:
+    def test_small_document_is_truncated_like_truncate_content(self) -> None:
+        html = "<main>" + "".join(f"<p>para {i}</p>" for i in range(50)) + "</main>"
+        full = html_to_markdown_clean(html)
+        assert html_to_markdown_clean(html, max_chars=len(full)) == full
+        assert html_to_markdown_clean(html, max_chars=100) == truncate_content(full, max_length=100)
+
+    def test_large_document_converts_only_a_bounded_prefix(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        seen: list[int] = []
+        real_md = utils.md
+
+        def md(html: str, **kwargs: Any) -> str:
+            seen.append(len(html))
+            return real_md(html, **kwargs)
+
+        monkeypatch.setattr(utils, "md", md)
+        html = "<main>" + "<p>lorem ipsum</p>" * 100_000 + "</main>"
+        out = html_to_markdown_clean(html, max_chars=500)
+        assert seen == [500 * utils._MD_HTML_BUDGET_FACTOR]
+        assert out.startswith("lorem ipsum")
+        assert out.endswith("\n\n... [Content Truncated at 500 chars]")
+        assert len(out) == 500 + len("\n\n... [Content Truncated at 500 chars]")
+
+
+class TestSafeCtxInfo:
+    class Ctx:
+        def __init__(self) -> None:
+            self.messages: list[str] = []
+
+        async def info(self, message: str) -> None:
+            self.messages.append(message)
+
+    def test_args_are_formatted_only_with_a_context(self) -> None:
+        class Boom:
+            def __str__(self) -> str:
+                raise AssertionError("formatted without a context")
+
+        asyncio.run(safe_ctx_info(None, "count=%s", Boom()))
+        ctx = self.Ctx()
+        asyncio.run(safe_ctx_info(ctx, "count=%s concurrency=%s", 3, 2))
+        asyncio.run(safe_ctx_info(ctx, "100% done"))
+        assert ctx.messages == ["count=3 concurrency=2", "100% done"]
+
+    def test_mismatched_args_do_not_raise(self) -> None:
+        ctx = self.Ctx()
+        asyncio.run(safe_ctx_info(ctx, "count=%d", "x"))
+        asyncio.run(safe_ctx_info(ctx, "no placeholders", 1))
+        assert ctx.messages == ["count=%d ('x',)", "no placeholders (1,)"]
+
+
+def test_encode_png_base64() -> None:
+    assert encode_png_base64(b"\x89PNG\r\n") == "iVBORw0K"
+    assert encode_png_base64(bytearray()) == ""
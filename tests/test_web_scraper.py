@@ -0,0 +1,70 @@
+"""Tests for the compact web_scraper tool."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from thordata_mcp.tools import product_compact as pc
+
+
+@pytest.fixture
+def previews(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """Stub the task client and preview fetch; return the max_chars each preview used."""
+    seen: list[int] = []
+
+    async def get_task_result(tid: str, file_type: str = "json") -> str:
+        return f"https://dl.test/{tid}.{file_type}"
+
+    async def get_client() -> SimpleNamespace:
+        return SimpleNamespace(get_task_result=get_task_result)
+
+    async def fetch(url: str, *, max_chars: int = 20_000) -> dict[str, Any]:
+        seen.append(max_chars)
+        return {"ok": True, "status": 200, "data": [{"title": "t"}], "truncated": False}
+
+    monkeypatch.setattr(pc.ServerContext, "get_client", get_client)
+    monkeypatch.setattr(pc, "_fetch_json_preview", fetch)
+    return seen
+
+
+@pytest.mark.parametrize(("value", "expected"), [(None, 20_000), (0, 1), (-5, 1), ("500", 500), (10**9, 100_000)])
+def test_result_preview_max_chars_is_clamped(compact_tools, previews, value: Any, expected: int) -> None:
+    params: dict[str, Any] = {"task_id": "t1"}
+    if value is not None:
+        params["preview_max_chars"] = value
+    r = asyncio.run(compact_tools["web_scraper"]("result", params=params))
+    assert r["ok"] is True
+    assert previews == [expected]
+
+
+@pytest.mark.parametrize("action", ["result", "result_batch"])
+def test_result_rejects_non_int_preview_max_chars(compact_tools, previews, action: str) -> None:
+    params = {"task_id": "t1", "task_ids": ["t1"], "preview": True, "preview_max_chars": "lots"}
+    r = asyncio.run(compact_tools["web_scraper"](action, params=params))
+    assert r["ok"] is False
+    assert r["error"]["code"] == "E4001"
+    assert "preview_max_chars must be an integer" in r["error"]["message"]
+    assert not previews
+
+
+def test_catalog_and_example_responses_do_not_share_cached_dicts(compact_tools) -> None:
+    ws = compact_tools["web_scraper"]
+    first = asyncio.run(ws("catalog", params={"limit": 1}))["output"]["tools"][0]
+    first["name"] = "mutated"
+    next(iter(first["fields"].values()))["required"] = "mutated"
+    second = asyncio.run(ws("catalog", params={"limit": 1}))["output"]["tools"][0]
+    assert second["name"] != "mutated"
+    assert "mutated" not in [f["required"] for f in second["fields"].values()]
+
+    key = second["tool_key"]
+    tpl = asyncio.run(ws("example", params={"tool": key}))["output"]["params_template"]
+    tpl["mutated"] = True
+    for v in tpl.values():
+        if isinstance(v, dict):
+            v["mutated"] = True
+    again = asyncio.run(ws("example", params={"tool": key}))["output"]["params_template"]
+    assert "mutated" not in again
+    assert all("mutated" not in v for v in again.values() if isinstance(v, dict))